@@ -5,14 +5,17 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from backend.app.core.config import Settings
+from app.core.config import settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url with our settings
-config.set_main_option('sqlalchemy.url', Settings.database_url)
+# Override sqlalchemy.url with our settings (psycopg 3 driver; escape % for configparser)
+config.set_main_option(
+    'sqlalchemy.url',
+    settings.database_url.replace("postgresql://", "postgresql+psycopg://", 1).replace("%", "%%"),
+)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
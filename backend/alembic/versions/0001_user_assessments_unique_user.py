@@ -0,0 +1,64 @@
+"""Unique user_assessments.user_id
+
+Databases created before assessment_schema.sql declared UNIQUE(user_id) can hold
+several rows per user. Keep the most recent one and add the constraint that
+save_assessment_result's ON CONFLICT (user_id) relies on.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        DELETE FROM user_assessments ua
+        USING (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY user_id ORDER BY completed_at DESC NULLS LAST, id DESC
+            ) AS rn
+            FROM user_assessments
+        ) ranked
+        WHERE ua.id = ranked.id AND ranked.rn > 1
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conrelid = 'user_assessments'::regclass
+                  AND contype = 'u'
+                  AND conkey = ARRAY[(
+                      SELECT attnum FROM pg_attribute
+                      WHERE attrelid = 'user_assessments'::regclass AND attname = 'user_id'
+                  )]::smallint[]
+            ) THEN
+                ALTER TABLE user_assessments
+                    ADD CONSTRAINT user_assessments_user_id_key UNIQUE (user_id);
+            END IF;
+        END
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Nothing to undo: deleted duplicate rows cannot be restored, and the
+    constraint is part of the baseline schema (assessment_schema.sql), so it
+    may not have been added by this migration.
+    """
+    pass
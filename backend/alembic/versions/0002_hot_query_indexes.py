@@ -0,0 +1,44 @@
+"""Indexes for hot learning-path queries
+
+Covers prerequisite lookups in both directions, per-level topic listing in
+display order, a user's progress filtered by status and recency, and ordered
+resource lookups. Indexes are built CONCURRENTLY so the tables stay writable.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("idx_topic_prerequisites_topic", "topic_prerequisites (topic_id)"),
+    ("idx_topic_prerequisites_prerequisite", "topic_prerequisites (prerequisite_topic_id)"),
+    ("idx_topics_level_order", "topics (level, order_index)"),
+    ("idx_user_progress_user_status_accessed", "user_progress (user_id, status, last_accessed)"),
+    ("idx_learning_resources_topic_order", "learning_resources (topic_id, order_index)"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, target in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
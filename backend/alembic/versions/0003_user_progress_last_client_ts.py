@@ -0,0 +1,32 @@
+"""user_progress.last_client_ts
+
+Records the newest batch-sync event applied to each progress row, so that
+update_topic_progress_batch can ignore retried or late events instead of
+adding their time again or rolling progress back.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS last_client_ts TIMESTAMPTZ")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE user_progress DROP COLUMN IF EXISTS last_client_ts")
@@ -0,0 +1,39 @@
+"""progress_sync_events
+
+Records every batch-sync event applied to user_progress by (user_id, topic_id,
+client_ts), so update_topic_progress_batch adds each event's time once even when
+a batch is resent, while older events from another device still count.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS progress_sync_events (
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            topic_id INTEGER REFERENCES topics(id) ON DELETE CASCADE,
+            client_ts TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (user_id, topic_id, client_ts)
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS progress_sync_events")
@@ -1,14 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, List
+from fastapi import APIRouter, HTTPException, Depends, Header
+from typing import Dict, List, Optional
 from app.schemas.assessment import (
     AssessmentQuestion, AssessmentSubmission, AssessmentResult
 )
 from app.crud.assessment import (
-    get_assessment_questions, calculate_user_level, 
-    save_assessment_result, get_user_assessment, has_completed_assessment
+    get_assessment_questions, save_assessment_result, get_user_assessment, has_completed_assessment
 )
 from app.core.dependencies import get_current_user
 from app.core.database import get_db
+from app.core.http_cache import get_cached_payload, cache_payload, payload_response
+from app.services.assessment_key import get_answer_key
 
 router = APIRouter(
     prefix="/api/assessment",
@@ -17,19 +18,29 @@ router = APIRouter(
 )
 
 @router.get("/questions", response_model=List[AssessmentQuestion], summary="Get assessment questions")
-async def get_questions(current_user: Dict = Depends(get_current_user)):
+async def get_questions(
+    if_none_match: Optional[str] = Header(None),
+    current_user: Dict = Depends(get_current_user)
+):
     """
     Get all assessment questions for skill evaluation.
     
     Returns a list of questions to determine user's programming level.
+    The serialised list is cached per assessment version and sent with an ETag;
+    a matching If-None-Match gets 304 without a database query.
     """
     try:
-        with get_db() as conn:
-            cur = conn.cursor()
-            questions = get_assessment_questions(cur)
+        answer_key = await get_answer_key()
+        key = ("assessment_questions", answer_key.version)
+        
+        payload = get_cached_payload(key)
+        if payload is None:
+            async with get_db() as conn:
+                cur = conn.cursor()
+                questions = await get_assessment_questions(cur)
             
             # Don't include correct answers in response
-            return [
+            payload = cache_payload(key, [
                 {
                     "id": q['id'],
                     "question_text": q['question_text'],
@@ -39,7 +50,9 @@ async def get_questions(current_user: Dict = Depends(get_current_user)):
                     "order_index": q['order_index']
                 }
                 for q in questions
-            ]
+            ])
+        
+        return payload_response(payload, if_none_match)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch questions: {str(e)}")
 
@@ -54,44 +67,27 @@ async def submit_assessment(
     Evaluates user's answers and assigns them to beginner, intermediate, or advanced path.
     """
     try:
-        with get_db() as conn:
+        # Score against the cached answer key (no question reads per submission)
+        answer_key = await get_answer_key()
+        total_questions = answer_key.total_questions
+        max_points = answer_key.max_points
+        
+        if total_questions == 0 or max_points == 0:
+            raise HTTPException(status_code=400, detail="No assessment questions available")
+        
+        score, assigned_level = answer_key.grade(
+            (ans.question_id, ans.answer) for ans in submission.answers
+        )
+        
+        async with get_db() as conn:
             cur = conn.cursor()
             
-            # Get all questions with correct answers
-            questions = get_assessment_questions(cur)
-            
-            # Calculate score
-            score = 0
-            total_questions = len(questions)
-            
-            # Create answer map
-            answer_map = {ans.question_id: ans.answer for ans in submission.answers}
-            
-            # Get correct answers
-            cur.execute("SELECT id, correct_answer, points FROM assessment_questions")
-            correct_answers = {row['id']: row for row in cur.fetchall()}
-            
-            # Compute maximum possible points (handles variable point weights)
-            max_points = sum((row.get('points') or 0) for row in correct_answers.values())
-            
-            if total_questions == 0 or max_points == 0:
-                raise HTTPException(status_code=400, detail="No assessment questions available")
-            
-            # Score answers
-            for q_id, user_answer in answer_map.items():
-                if q_id in correct_answers:
-                    if user_answer == correct_answers[q_id]['correct_answer']:
-                        score += correct_answers[q_id]['points']
-            
-            # Determine level
-            assigned_level = calculate_user_level(score, max_points)
-            
             # Save result
             answers_data = [
                 {"question_id": ans.question_id, "answer": ans.answer}
                 for ans in submission.answers
             ]
-            save_assessment_result(cur, current_user['id'], score, total_questions, assigned_level, answers_data)
+            await save_assessment_result(cur, current_user['id'], score, total_questions, assigned_level, answers_data)
             
             # Generate response message
             percentage = (score / max_points) * 100
@@ -120,6 +116,8 @@ async def submit_assessment(
                 next_steps=level_messages[assigned_level]["next_steps"]
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -133,13 +131,13 @@ async def get_assessment_status(current_user: Dict = Depends(get_current_user)):
     Returns assessment status and results if completed.
     """
     try:
-        with get_db() as conn:
+        async with get_db() as conn:
             cur = conn.cursor()
             
-            completed = has_completed_assessment(cur, current_user['id'])
+            completed = await has_completed_assessment(cur, current_user['id'])
             
             if completed:
-                result = get_user_assessment(cur, current_user['id'])
+                result = await get_user_assessment(cur, current_user['id'])
                 return {
                     "completed": True,
                     "assigned_level": result['assigned_level'],
@@ -163,11 +161,11 @@ async def retake_assessment(current_user: Dict = Depends(get_current_user)):
     Resets assessment status so user can take it again.
     """
     try:
-        with get_db() as conn:
+        async with get_db() as conn:
             cur = conn.cursor()
             
             # Mark assessment as not completed
-            cur.execute("""
+            await cur.execute("""
                 UPDATE users
                 SET has_completed_assessment = FALSE
                 WHERE id = %s
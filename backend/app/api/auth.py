@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
+from psycopg.errors import UniqueViolation
 from app.schemas.user import UserRegister, UserResponse, UsernameCheck, EmailCheck
 from app.schemas.auth import UserLogin, LoginResponse
 from app.crud.user import check_username_exists, check_email_exists, create_user
 from app.crud.auth import get_user_by_username, get_user_by_email
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password_async, hash_password_async, create_access_token, PasswordHashingBusy
 from app.core.dependencies import get_current_user
 from app.core.database import get_db
 from typing import Dict
@@ -26,29 +27,44 @@ async def register_user(user: UserRegister):
     Returns user information and success message.
     """
     try:
-        with get_db() as conn:
+        async with get_db() as conn:
             cur = conn.cursor()
             
             # Check if username already exists
-            if check_username_exists(cur, user.username):
+            if await check_username_exists(cur, user.username):
                 raise HTTPException(status_code=400, detail="Username already exists")
             
             # Check if email already exists
-            if check_email_exists(cur, user.email):
+            if await check_email_exists(cur, user.email):
                 raise HTTPException(status_code=400, detail="Email already registered")
-            
-            # Create new user
-            new_user = create_user(cur, user)
-            
-            return UserResponse(
-                id=new_user['id'],
-                username=new_user['username'],
-                email=new_user['email'],
-                message="User registered successfully"
-            )
+        
+        # Hash without holding a pooled connection so queued hashes cannot exhaust the pool
+        password_hash = await hash_password_async(user.password)
+        
+        # Create new user; a concurrent registration may have taken the name meanwhile
+        try:
+            async with get_db() as conn:
+                new_user = await create_user(conn.cursor(), user, password_hash)
+        except UniqueViolation as e:
+            if e.diag.constraint_name == "users_email_key":
+                raise HTTPException(status_code=400, detail="Email already registered")
+            raise HTTPException(status_code=400, detail="Username already exists")
+        
+        return UserResponse(
+            id=new_user['id'],
+            username=new_user['username'],
+            email=new_user['email'],
+            message="User registered successfully"
+        )
             
     except HTTPException:
         raise
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -64,9 +80,9 @@ async def check_username(username: str):
     Returns whether the username is available.
     """
     try:
-        with get_db() as conn:
+        async with get_db() as conn:
             cur = conn.cursor()
-            exists = check_username_exists(cur, username)
+            exists = await check_username_exists(cur, username)
             return UsernameCheck(available=not exists)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -81,9 +97,9 @@ async def check_email(email: str):
     Returns whether the email is available.
     """
     try:
-        with get_db() as conn:
+        async with get_db() as conn:
             cur = conn.cursor()
-            exists = check_email_exists(cur, email)
+            exists = await check_email_exists(cur, email)
             return EmailCheck(available=not exists)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -100,40 +116,47 @@ async def login_user(credentials: UserLogin):
     Token expires after 30 minutes.
     """
     try:
-        with get_db() as conn:
+        async with get_db() as conn:
             cur = conn.cursor()
             
             # Try to find user by username or email
-            user = get_user_by_username(cur, credentials.username)
+            user = await get_user_by_username(cur, credentials.username)
             if not user:
                 # Try email if username not found
-                user = get_user_by_email(cur, credentials.username)
-            
-            # Check if user exists
-            if not user:
-                raise HTTPException(status_code=401, detail="Invalid username or password")
-            
-            # Verify password
-            if not verify_password(credentials.password, user['password_hash']):
-                raise HTTPException(status_code=401, detail="Invalid username or password")
-            
-            # Create access token
-            access_token = create_access_token(
-                data={"sub": str(user['id']), "username": user['username']}  # Convert user_id to string
-            )
-            
-            return LoginResponse(
-                access_token=access_token,
-                token_type="bearer",
-                user={
-                    "id": user['id'],
-                    "username": user['username'],
-                    "email": user['email']
-                }
-            )
+                user = await get_user_by_email(cur, credentials.username)
+        
+        # Check if user exists
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        
+        # Verify password after releasing the connection so queued hashes cannot exhaust the pool
+        if not await verify_password_async(credentials.password, user['password_hash']):
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        
+        # Create access token
+        access_token = create_access_token(
+            # Convert user_id to string; username/email let AUTH_TRUST_TOKEN_CLAIMS skip the user lookup
+            data={"sub": str(user['id']), "username": user['username'], "email": user['email']}
+        )
+        
+        return LoginResponse(
+            access_token=access_token,
+            token_type="bearer",
+            user={
+                "id": user['id'],
+                "username": user['username'],
+                "email": user['email']
+            }
+        )
             
     except HTTPException:
         raise
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -1,14 +1,22 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
+import json
+import logging
+import math
 from app.schemas.chatbot import ChatMessage, ChatResponse, QuizRequest, QuizResponse
-from app.services.chatbot import get_chatbot_response, generate_quiz
+from app.services.chatbot import (
+    get_chatbot_response, get_cached_chatbot_response, stream_chatbot_response, generate_quiz
+)
+from app.services.llm_gateway import check_rate_limit, LLMRateLimited, LLMUnavailable
 from app.core.dependencies import get_current_user
 from app.core.database import get_db
-from app.crud.learning_path import (
-    get_user_level,
-    get_user_completed_topics,
-    get_topic_detail,
-)
+from app.crud.learning_path import get_user_learning_context
+from app.services.curriculum import get_curriculum
+from app.services.quiz_bank import bank_questions
+from app.crud.quiz_bank import sample_quiz_questions
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/chatbot",
@@ -16,6 +24,25 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+async def _get_user_context(cur, user_id: int) -> Dict:
+    """Collect the learner context passed to the chatbot prompt."""
+    context = await get_user_learning_context(cur, user_id)
+    completed = context['completed_count']
+    total = context['total_count']
+    
+    return {
+        'level': context['level'],
+        'current_topic': context['current_topic'] or 'None',
+        'completed_count': completed,
+        'total_count': total,
+        'progress_percentage': round((completed / total * 100), 2) if total > 0 else 0
+    }
+
+def _sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 @router.post("/ask", response_model=ChatResponse, summary="Ask the AI chatbot")
 async def ask_chatbot(
     chat_message: ChatMessage,
@@ -30,54 +57,95 @@ async def ask_chatbot(
     - Your current progress
     """
     try:
-        with get_db() as conn:
+        # Fetch context, then release the connection before waiting on the LLM
+        async with get_db() as conn:
             cur = conn.cursor()
-            
-            # Get user context
-            user_level = get_user_level(cur, current_user['id'])
-            completed_topics = get_user_completed_topics(cur, current_user['id'])
-            
-            # Get total topics for level
-            cur.execute(
-                "SELECT COUNT(*) as total FROM topics WHERE level = %s",
-                (user_level,)
-            )
-            total = cur.fetchone()['total']
-            
-            # Get current topic (last accessed)
-            cur.execute("""
-                SELECT t.title
-                FROM user_progress up
-                JOIN topics t ON up.topic_id = t.id
-                WHERE up.user_id = %s AND up.status = 'in_progress'
-                ORDER BY up.last_accessed DESC
-                LIMIT 1
-            """, (current_user['id'],))
-            
-            current_topic_row = cur.fetchone()
-            current_topic = current_topic_row['title'] if current_topic_row else 'None'
-            
-            # Build context
-            user_context = {
-                'level': user_level,
-                'current_topic': current_topic,
-                'completed_count': len(completed_topics),
-                'total_count': total,
-                'progress_percentage': round((len(completed_topics) / total * 100), 2) if total > 0 else 0
-            }
-            
-            # Get AI response
-            response_text = await get_chatbot_response(chat_message.message, user_context)
-            
-            return ChatResponse(
-                response=response_text,
-                context=user_context
-            )
-            
+            user_context = await _get_user_context(cur, current_user['id'])
+        
+        # Get AI response
+        response_text = await get_chatbot_response(
+            chat_message.message, user_context, user_id=current_user['id']
+        )
+        
+        return ChatResponse(
+            response=response_text,
+            context=user_context
+        )
+        
+    except LLMRateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many chatbot requests, please slow down",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except LLMUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="The AI assistant is busy, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Chatbot error: {str(e)}")
+
+@router.post("/ask/stream", summary="Ask the AI chatbot (streaming)")
+async def ask_chatbot_stream(
+    chat_message: ChatMessage,
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Send a message to the AI learning assistant and stream the answer.
+    
+    Responds with Server-Sent Events: one `context` event, then `data` events
+    carrying `{"delta": "..."}` text chunks, then a final `done` event
+    (or an `error` event if generation fails part-way).
+    """
+    try:
+        async with get_db() as conn:
+            cur = conn.cursor()
+            user_context = await _get_user_context(cur, current_user['id'])
+        
+        # Cached answers are free, as on /ask; otherwise charge the rate limit
+        # before the stream opens so it can still be a 429
+        cached = await get_cached_chatbot_response(chat_message.message, user_context)
+        if cached is None:
+            check_rate_limit(current_user['id'])
+    except LLMRateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many chatbot requests, please slow down",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Chatbot error: {str(e)}")
+    
+    async def event_stream():
+        yield _sse_event(user_context, event="context")
+        if cached is not None:
+            yield _sse_event({"delta": cached})
+            yield _sse_event({}, event="done")
+            return
+        try:
+            async for text in stream_chatbot_response(chat_message.message, user_context):
+                yield _sse_event({"delta": text})
+        except LLMUnavailable:
+            yield _sse_event({"detail": "The AI assistant is busy, please try again shortly"}, event="error")
+            return
+        except Exception as e:
+            logger.error(f"[CHATBOT STREAM ERROR] {str(e)}", exc_info=True)
+            yield _sse_event({"detail": "Sorry, I'm having trouble responding right now."}, event="error")
+            return
+        yield _sse_event({}, event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so chunks reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/quiz", response_model=QuizResponse, summary="Generate quiz for a topic")
 async def generate_topic_quiz(
@@ -85,37 +153,65 @@ async def generate_topic_quiz(
     current_user: Dict = Depends(get_current_user)
 ):
     """
-    Generate AI-powered quiz questions for a specific topic.
+    Get quiz questions for a specific topic.
+    
+    Questions are sampled from the pre-generated quiz bank; they are only
+    generated live when the bank does not hold enough for this topic yet.
     """
     try:
-        with get_db() as conn:
+        curriculum = await get_curriculum()
+        
+        # Get topic details
+        topic = curriculum.get_topic(quiz_request.topic_id)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        
+        # Connections are only held around the bank read and write, never across the LLM call
+        async with get_db() as conn:
             cur = conn.cursor()
-            
-            # Get topic details
-            topic = get_topic_detail(cur, quiz_request.topic_id)
-            if not topic:
-                raise HTTPException(status_code=404, detail="Topic not found")
-            
-            # Generate quiz questions
-            questions = await generate_quiz(
-                topic['title'],
-                topic['content'],
-                quiz_request.num_questions
-            )
-            
-            if not questions:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to generate quiz questions"
-                )
-            
+            banked = await sample_quiz_questions(cur, topic['id'], quiz_request.num_questions)
+        
+        if len(banked) >= quiz_request.num_questions:
             return QuizResponse(
-                questions=questions,
+                questions=[dict(q) for q in banked],
                 topic_title=topic['title']
             )
+        
+        # Bank is thin: generate quiz questions and keep the good ones
+        questions = await generate_quiz(
+            topic['title'],
+            topic['content'] or "",
+            quiz_request.num_questions,
+            user_id=current_user['id']
+        )
+        if questions:
+            await bank_questions(topic['id'], questions)
+        
+        if not questions:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to generate quiz questions"
+            )
+        
+        return QuizResponse(
+            questions=questions,
+            topic_title=topic['title']
+        )
             
     except HTTPException:
         raise
+    except LLMRateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many chatbot requests, please slow down",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except LLMUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="The AI assistant is busy, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Depends, Header, status
+from typing import Dict, Optional
 from app.schemas.learning_path import (
-    LearningPathResponse, TopicResponse, TopicDetailResponse, StartTopicResponse
+    LearningPathResponse, LearningPathSummaryResponse, TopicResponse, TopicDetailResponse, TopicContentResponse,
+    StartTopicResponse, CompleteTopicResponse, ProgressBatchRequest, ProgressBatchResponse, HeartbeatRequest
 )
 from app.crud.learning_path import (
-    get_user_level, get_topics_by_level, get_topic_prerequisites,
-    get_user_progress_for_topic, get_user_completed_topics, determine_topic_status,
-    start_topic, complete_topic, get_topic_detail, get_prerequisite_details, get_topic_resources
+    build_learning_path, get_user_progress_for_topic, get_user_completed_topics,
+    get_user_learning_context, determine_topic_status, start_topic, complete_topic,
+    update_topic_progress_batch
 )
 from app.core.dependencies import get_current_user
 from app.core.database import get_db
+from app.core.http_cache import CachedPayload, get_or_build_payload, payload_response, fast_json_response
+from app.services.curriculum import get_curriculum
+from app.services.heartbeat import heartbeat_buffer
 
 router = APIRouter(
     prefix="/api/learning-path",
@@ -25,70 +29,23 @@ async def get_learning_path(current_user: Dict = Depends(get_current_user)):
     Returns all topics for the user's level with progress tracking.
     """
     try:
-        with get_db() as conn:
+        curriculum = await get_curriculum()
+        async with get_db() as conn:
             cur = conn.cursor()
+            path = await build_learning_path(cur, current_user['id'], curriculum)
             
-            # Get user's level
-            user_level = get_user_level(cur, current_user['id'])
-            
-            # Get all topics for this level
-            topics = get_topics_by_level(cur, user_level)
-            
-            # Get user's completed topics
-            completed_topics = get_user_completed_topics(cur, current_user['id'])
-            
-            # Build topic responses with status
-            topic_responses = []
-            total_topics = len(topics)
-            completed_count = 0
-            in_progress_count = 0
-            
-            for topic in topics:
-                # Get prerequisites
-                prerequisites = get_topic_prerequisites(cur, topic['id'])
-                
-                # Get user progress
-                user_progress = get_user_progress_for_topic(cur, current_user['id'], topic['id'])
-                
-                # Determine status
-                status = determine_topic_status(
-                    topic['id'], 
-                    prerequisites, 
-                    completed_topics, 
-                    user_progress
-                )
-                
-                # Count progress
-                if status == 'completed':
-                    completed_count += 1
-                elif status == 'in_progress':
-                    in_progress_count += 1
-                
-                progress_percentage = float(user_progress['progress_percentage']) if user_progress else 0
-                
-                topic_responses.append(TopicResponse(
-                    id=topic['id'],
-                    title=topic['title'],
-                    description=topic['description'],
-                    difficulty_level=topic['difficulty_level'],
-                    estimated_hours=float(topic['estimated_hours']),
-                    order_index=topic['order_index'],
-                    level=topic['level'],
-                    status=status,
-                    progress_percentage=progress_percentage,
-                    prerequisites=prerequisites
-                ))
-            
-            # Calculate overall progress
-            overall_progress = (completed_count / total_topics * 100) if total_topics > 0 else 0
+            # build_learning_path already returns plain dicts shaped like the response model
+            fast = fast_json_response(path)
+            if fast is not None:
+                return fast
             
             return LearningPathResponse(
-                user_level=user_level,
-                total_topics=total_topics,
-                completed_topics=completed_count,
-                in_progress_topics=in_progress_count,
-                progress_percentage=round(overall_progress, 2),
-                topics=topic_responses
+                user_level=path['user_level'],
+                total_topics=path['total_topics'],
+                completed_topics=path['completed_topics'],
+                in_progress_topics=path['in_progress_topics'],
+                progress_percentage=path['progress_percentage'],
+                topics=[TopicResponse(**topic) for topic in path['topics']]
             )
             
     except Exception as e:
@@ -96,62 +53,105 @@ async def get_learning_path(current_user: Dict = Depends(get_current_user)):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to load learning path: {str(e)}")
 
+@router.get("/summary", response_model=LearningPathSummaryResponse, summary="Get learning progress summary")
+async def get_learning_path_summary(current_user: Dict = Depends(get_current_user)):
+    """
+    Get progress counts for the user's level without loading every topic.
+    
+    Reads the maintained user_level_progress row, so it is cheap enough for dashboards.
+    """
+    try:
+        async with get_db() as conn:
+            cur = conn.cursor()
+            context = await get_user_learning_context(cur, current_user['id'])
+        
+        total = context['total_count']
+        completed = context['completed_count']
+        return LearningPathSummaryResponse(
+            user_level=context['level'],
+            total_topics=total,
+            completed_topics=completed,
+            in_progress_topics=context['in_progress_count'],
+            progress_percentage=round(completed / total * 100, 2) if total > 0 else 0,
+            current_topic=context['current_topic']
+        )
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to load progress summary: {str(e)}")
+
+def _topic_content_payload(curriculum, topic_id: int) -> Optional[CachedPayload]:
+    """Static part of topic detail, serialised once per curriculum version."""
+    topic = curriculum.get_topic(topic_id)
+    if not topic:
+        return None
+    
+    def build() -> Dict:
+        return {
+            "id": topic['id'],
+            "title": topic['title'],
+            "description": topic['description'],
+            "content": topic['content'],
+            "difficulty_level": topic['difficulty_level'],
+            "estimated_hours": float(topic['estimated_hours']),
+            "level": topic['level'],
+            "prerequisites": [
+                {"id": p['id'], "title": p['title'], "level": p['level']}
+                for p in curriculum.prerequisite_details_for(topic_id)
+            ],
+            "resources": [
+                {
+                    "id": r['id'],
+                    "title": r['title'],
+                    "url": r['resource_url'],
+                    "type": r['resource_type'],
+                    "platform": r['platform'],
+                    "duration": int(r['duration_minutes']) if r.get('duration_minutes') is not None else None
+                }
+                for r in curriculum.resources_for(topic_id)
+            ],
+        }
+    
+    return get_or_build_payload(("topic_content", curriculum.version, topic_id), build)
+
 @router.get("/topics/{topic_id}", response_model=TopicDetailResponse, summary="Get topic details")
 async def get_topic_details(topic_id: int, current_user: Dict = Depends(get_current_user)):
     """
     Get detailed information about a specific topic.
     """
     try:
-        with get_db() as conn:
+        curriculum = await get_curriculum()
+        
+        # Get topic details, prerequisites and resources
+        content = _topic_content_payload(curriculum, topic_id)
+        if content is None:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        
+        async with get_db() as conn:
             cur = conn.cursor()
             
-            # Get topic details
-            topic = get_topic_detail(cur, topic_id)
-            if not topic:
-                raise HTTPException(status_code=404, detail="Topic not found")
-            
             # Get user progress
-            user_progress = get_user_progress_for_topic(cur, current_user['id'], topic_id)
+            user_progress = await get_user_progress_for_topic(cur, current_user['id'], topic_id)
+            completed = curriculum.completion_set(
+                await get_user_completed_topics(cur, current_user['id'])
+            )
             
-            # Get prerequisites
-            prerequisites = get_prerequisite_details(cur, topic_id)
-            completed_topics = get_user_completed_topics(cur, current_user['id'])
+            # Determine status
+            prerequisites_met = completed.satisfies(curriculum.all_prerequisite_masks.get(topic_id, 0))
+            status = determine_topic_status(prerequisites_met, user_progress)
             
-            # Get resources
-            resources = get_topic_resources(cur, topic_id)
+            detail = {
+                **content.data,
+                "status": status,
+                "progress_percentage": float(user_progress['progress_percentage']) if user_progress else 0,
+                "time_spent_minutes": (user_progress['time_spent_minutes'] or 0) if user_progress else 0,
+                "last_accessed": user_progress['last_accessed'] if user_progress else None,
+            }
+            fast = fast_json_response(detail)
+            if fast is not None:
+                return fast
             
-            # Determine status
-            prereq_ids = [p['id'] for p in prerequisites]
-            status = determine_topic_status(topic_id, prereq_ids, completed_topics, user_progress)
-            
-            return TopicDetailResponse(
-                id=topic['id'],
-                title=topic['title'],
-                description=topic['description'],
-                content=topic['content'],
-                difficulty_level=topic['difficulty_level'],
-                estimated_hours=float(topic['estimated_hours']),
-                level=topic['level'],
-                status=status,
-                progress_percentage=user_progress['progress_percentage'] if user_progress else 0,
-                time_spent_minutes=user_progress['time_spent_minutes'] if user_progress else 0,
-                last_accessed=user_progress['last_accessed'] if user_progress else None,
-                prerequisites=[
-                    {"id": p['id'], "title": p['title'], "level": p['level']} 
-                    for p in prerequisites
-                ],
-                resources=[
-                    {
-                        "id": r['id'],
-                        "title": r['title'],
-                        "url": r['resource_url'],
-                        "type": r['resource_type'],
-                        "platform": r['platform'],
-                        "duration": int(r['duration_minutes']) if r.get('duration_minutes') is not None else None
-                    }
-                    for r in resources
-                ]
-            )
+            return TopicDetailResponse(**detail)
             
     except HTTPException:
         raise
@@ -160,34 +160,60 @@ async def get_topic_details(topic_id: int, current_user: Dict = Depends(get_curr
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/topics/{topic_id}/content", response_model=TopicContentResponse, summary="Get topic content")
+async def get_topic_content(
+    topic_id: int,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Get the static part of a topic (content, prerequisites, resources) without user progress.
+    
+    Served from memory with an ETag that changes only when the curriculum does;
+    a matching If-None-Match gets 304.
+    """
+    try:
+        curriculum = await get_curriculum()
+        content = _topic_content_payload(curriculum, topic_id)
+        if content is None:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        return payload_response(content, if_none_match)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/topics/{topic_id}/start", response_model=StartTopicResponse, summary="Start learning a topic")
 async def start_learning_topic(topic_id: int, current_user: Dict = Depends(get_current_user)):
     """
     Mark a topic as started and track progress.
     """
     try:
-        with get_db() as conn:
+        curriculum = await get_curriculum()
+        
+        # Check if topic exists
+        topic = curriculum.get_topic(topic_id)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        
+        async with get_db() as conn:
             cur = conn.cursor()
             
-            # Check if topic exists
-            topic = get_topic_detail(cur, topic_id)
-            if not topic:
-                raise HTTPException(status_code=404, detail="Topic not found")
-            
             # Check prerequisites
-            prerequisites = get_topic_prerequisites(cur, topic_id)
-            completed_topics = get_user_completed_topics(cur, current_user['id'])
+            completed = curriculum.completion_set(
+                await get_user_completed_topics(cur, current_user['id'])
+            )
             
-            if prerequisites:
-                all_completed = all(prereq in completed_topics for prereq in prerequisites)
-                if not all_completed:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail="Please complete prerequisite topics first"
-                    )
+            if not completed.satisfies(curriculum.prerequisite_masks.get(topic_id, 0)):
+                raise HTTPException(
+                    status_code=400, 
+                    detail="Please complete prerequisite topics first"
+                )
             
             # Start the topic
-            start_topic(cur, current_user['id'], topic_id)
+            await start_topic(cur, current_user['id'], topic_id)
             
             return StartTopicResponse(
                 message=f"Started learning: {topic['title']}",
@@ -202,28 +228,96 @@ async def start_learning_topic(topic_id: int, current_user: Dict = Depends(get_c
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/topics/{topic_id}/complete", summary="Mark topic as completed")
+@router.post("/topics/{topic_id}/complete", response_model=CompleteTopicResponse, summary="Mark topic as completed")
 async def complete_learning_topic(topic_id: int, current_user: Dict = Depends(get_current_user)):
     """
     Mark a topic as completed.
+    
+    Returns the topics this completion unlocked, found from the topic's
+    dependents in the curriculum snapshot rather than by re-checking the roadmap.
     """
     try:
-        with get_db() as conn:
+        curriculum = await get_curriculum()
+        
+        async with get_db() as conn:
             cur = conn.cursor()
             
             # Check if topic exists and user has started it
-            user_progress = get_user_progress_for_topic(cur, current_user['id'], topic_id)
+            user_progress = await get_user_progress_for_topic(cur, current_user['id'], topic_id)
             if not user_progress:
                 raise HTTPException(status_code=400, detail="Please start the topic first")
             
+            completed_before = curriculum.completion_set(
+                await get_user_completed_topics(cur, current_user['id'])
+            )
+            
             # Complete the topic
-            complete_topic(cur, current_user['id'], topic_id)
+            await complete_topic(cur, current_user['id'], topic_id)
+            
+            unlocked = [
+                {"id": unlocked_id, "title": curriculum.get_topic(unlocked_id)['title']}
+                for unlocked_id in curriculum.newly_unlocked(topic_id, completed_before)
+            ]
             
-            return {"message": "Topic completed successfully", "topic_id": topic_id}
+            return CompleteTopicResponse(
+                message="Topic completed successfully",
+                topic_id=topic_id,
+                unlocked_topics=unlocked
+            )
             
     except HTTPException:
         raise
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/topics/{topic_id}/heartbeat", status_code=status.HTTP_202_ACCEPTED, summary="Record time spent on a topic")
+async def topic_heartbeat(topic_id: int, heartbeat: HeartbeatRequest, current_user: Dict = Depends(get_current_user)):
+    """
+    Record time spent on a topic.
+    
+    Heartbeats are buffered in memory and written in batches, so this endpoint
+    does not touch the database. Time for topics the user has not started is ignored.
+    """
+    curriculum = await get_curriculum()
+    if not curriculum.get_topic(topic_id):
+        raise HTTPException(status_code=404, detail="Topic not found")
+    
+    heartbeat_buffer.add(current_user['id'], topic_id, heartbeat.seconds)
+    return {"message": "Heartbeat recorded", "topic_id": topic_id}
+
+@router.post("/progress/batch", response_model=ProgressBatchResponse, summary="Sync a batch of progress events")
+async def sync_progress_batch(batch: ProgressBatchRequest, current_user: Dict = Depends(get_current_user)):
+    """
+    Apply many progress events at once (e.g. after a client was offline).
+    
+    Events are identified by (topic_id, client_ts): each one's time spent is added
+    once, so resending a batch is safe, and time recorded offline on another device
+    still counts even if older. Progress is last-writer-wins by client_ts; a late
+    batch never rolls it back. Events for topics the user has not started are skipped.
+    """
+    try:
+        events = {}
+        for event in batch.events:
+            # Exact duplicates within the batch count once
+            events.setdefault((event.topic_id, event.client_ts), event)
+        
+        async with get_db() as conn:
+            cur = conn.cursor()
+            updated = await update_topic_progress_batch(cur, current_user['id'], [
+                (event.topic_id, event.progress, event.time_spent, event.client_ts)
+                for event in events.values()
+            ])
+        
+        updated_set = set(updated)
+        return ProgressBatchResponse(
+            events_received=len(batch.events),
+            updated_topics=sorted(updated_set),
+            skipped_topics=sorted({event.topic_id for event in batch.events} - updated_set)
+        )
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,244 @@
+"""Run EXPLAIN (ANALYZE, BUFFERS) for every crud query and flag sequential scans.
+
+Meant for a seeded local database. Every query is executed for real inside one
+transaction that is rolled back at the end, so nothing is written.
+
+Usage (from backend/):
+    python -m app.commands.explain_queries [--no-seqscan] [--min-rows N] [--verbose]
+
+--no-seqscan disables sequential scans in the planner, so on a small seed
+database any Seq Scan left in a plan means no usable index exists. Exits 1 if
+any query is flagged.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import sys
+from app.core.database import get_db
+from app.crud import assessment, auth, learning_path, progress_summary, quiz_bank, user
+from app.schemas.user import UserRegister
+from app.services.curriculum import load_snapshot
+
+
+@dataclass
+class ExplainedQuery:
+    label: str
+    query: str
+    plan: Optional[Dict] = None
+    error: Optional[str] = None
+    seq_scans: List[str] = field(default_factory=list)
+
+
+class ExplainingCursor:
+    """Cursor wrapper that EXPLAIN ANALYZEs each statement before running it.
+
+    The EXPLAIN runs inside a savepoint that is rolled back, so write statements
+    take effect once and callers still get their normal results.
+    """
+
+    def __init__(self, cur):
+        self._cur = cur
+        self.label = ""
+        self.explained: List[ExplainedQuery] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cur, name)
+
+    async def _explain(self, query: str, params) -> None:
+        entry = ExplainedQuery(label=self.label, query=" ".join(query.split()))
+        self.explained.append(entry)
+        if entry.query.upper().startswith(("LOCK ", "SET ")):
+            return
+        await self._cur.execute("SAVEPOINT explain_query")
+        try:
+            await self._cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params)
+            entry.plan = (await self._cur.fetchone())['QUERY PLAN'][0]
+        except Exception as e:
+            entry.error = str(e).strip()
+        await self._cur.execute("ROLLBACK TO SAVEPOINT explain_query")
+
+    async def execute(self, query: str, params=None, **kwargs):
+        await self._explain(query, params)
+        return await self._cur.execute(query, params, **kwargs)
+
+    async def executemany(self, query: str, params_seq, **kwargs):
+        params_seq = list(params_seq)
+        if params_seq:
+            await self._explain(query, params_seq[0])
+        return await self._cur.executemany(query, params_seq, **kwargs)
+
+
+def _seq_scans(node: Dict) -> List[Dict]:
+    found = [node] if node.get("Node Type") == "Seq Scan" else []
+    for child in node.get("Plans", ()):
+        found.extend(_seq_scans(child))
+    return found
+
+
+# Queries that read a whole table by design (snapshot loads, rebuilds, counts)
+FULL_SCAN_OK = {
+    "assessment.get_assessment_questions",
+    "assessment.get_answer_key_rows",
+    "assessment.get_assessment_version",
+    "learning_path.get_content_version",
+    "learning_path.get_all_topics",
+    "learning_path.get_all_prerequisite_edges",
+    "learning_path.get_all_topic_resources",
+    "progress_summary.rebuild_user_level_progress",
+    "progress_summary.find_user_level_progress_drift",
+    "quiz_bank.get_quiz_bank_counts",
+}
+
+
+@dataclass
+class Sample:
+    user_id: int
+    username: str
+    email: str
+    topic_id: int
+    level: str
+    curriculum: Any
+
+
+def _scenarios(s: Sample) -> List[tuple]:
+    """(label, call) for every crud query, with arguments taken from the seed data."""
+    quiz_question = {
+        "question": "explain_queries sample question", "options": ["A", "B", "C", "D"],
+        "correct_answer": "A", "explanation": "",
+    }
+    return [
+        ("auth.get_user_by_username", lambda cur: auth.get_user_by_username(cur, s.username)),
+        ("auth.get_user_by_email", lambda cur: auth.get_user_by_email(cur, s.email)),
+        ("user.check_username_exists", lambda cur: user.check_username_exists(cur, s.username)),
+        ("user.check_email_exists", lambda cur: user.check_email_exists(cur, s.email)),
+        ("user.create_user", lambda cur: user.create_user(
+            cur, UserRegister(username="explain_queries_user", email="explain_queries@example.com",
+                              password="not-a-real-password"), "x")),
+        ("assessment.get_assessment_questions", assessment.get_assessment_questions),
+        ("assessment.get_assessment_version", assessment.get_assessment_version),
+        ("assessment.get_answer_key_rows", assessment.get_answer_key_rows),
+        ("assessment.save_assessment_result", lambda cur: assessment.save_assessment_result(
+            cur, s.user_id, 0, 1, s.level, [])),
+        ("assessment.get_user_assessment", lambda cur: assessment.get_user_assessment(cur, s.user_id)),
+        ("assessment.has_completed_assessment", lambda cur: assessment.has_completed_assessment(cur, s.user_id)),
+        ("assessment.get_assessment_answers_page", lambda cur: assessment.get_assessment_answers_page(cur, 0, 100)),
+        ("assessment.update_assessment_scores", lambda cur: assessment.update_assessment_scores(
+            cur, [(0, 0, 1, s.level)])),
+        ("assessment.update_user_levels", lambda cur: assessment.update_user_levels(cur, [(s.user_id, s.level)])),
+        ("learning_path.get_user_level", lambda cur: learning_path.get_user_level(cur, s.user_id)),
+        ("learning_path.get_topics_by_level", lambda cur: learning_path.get_topics_by_level(cur, s.level)),
+        ("learning_path.get_topic_prerequisites", lambda cur: learning_path.get_topic_prerequisites(cur, s.topic_id)),
+        ("learning_path.get_user_progress_for_topic", lambda cur: learning_path.get_user_progress_for_topic(
+            cur, s.user_id, s.topic_id)),
+        ("learning_path.get_user_completed_topics", lambda cur: learning_path.get_user_completed_topics(
+            cur, s.user_id)),
+        ("learning_path.get_user_learning_context", lambda cur: learning_path.get_user_learning_context(
+            cur, s.user_id)),
+        ("learning_path.build_learning_path", lambda cur: learning_path.build_learning_path(
+            cur, s.user_id, s.curriculum)),
+        ("learning_path.start_topic", lambda cur: learning_path.start_topic(cur, s.user_id, s.topic_id)),
+        ("learning_path.update_topic_progress", lambda cur: learning_path.update_topic_progress(
+            cur, s.user_id, s.topic_id, 50, 1)),
+        ("learning_path.update_topic_progress_batch", lambda cur: learning_path.update_topic_progress_batch(
+            cur, s.user_id, [(s.topic_id, 60, 1, datetime.now(timezone.utc))])),
+        ("learning_path.add_time_spent_batch", lambda cur: learning_path.add_time_spent_batch(
+            cur, [(s.user_id, s.topic_id, 1)])),
+        ("learning_path.complete_topic", lambda cur: learning_path.complete_topic(cur, s.user_id, s.topic_id)),
+        ("learning_path.get_topic_detail", lambda cur: learning_path.get_topic_detail(cur, s.topic_id)),
+        ("learning_path.get_prerequisite_details", lambda cur: learning_path.get_prerequisite_details(
+            cur, s.topic_id)),
+        ("learning_path.get_topic_resources", lambda cur: learning_path.get_topic_resources(cur, s.topic_id)),
+        ("learning_path.get_content_version", learning_path.get_content_version),
+        ("learning_path.get_all_topics", learning_path.get_all_topics),
+        ("learning_path.get_all_prerequisite_edges", learning_path.get_all_prerequisite_edges),
+        ("learning_path.get_all_topic_resources", learning_path.get_all_topic_resources),
+        ("quiz_bank.get_quiz_bank_counts", quiz_bank.get_quiz_bank_counts),
+        ("quiz_bank.sample_quiz_questions", lambda cur: quiz_bank.sample_quiz_questions(cur, s.topic_id, 5)),
+        ("quiz_bank.add_quiz_questions", lambda cur: quiz_bank.add_quiz_questions(cur, s.topic_id, [quiz_question])),
+        ("progress_summary.find_user_level_progress_drift",
+         lambda cur: progress_summary.find_user_level_progress_drift(cur, s.user_id)),
+        ("progress_summary.rebuild_user_level_progress",
+         lambda cur: progress_summary.rebuild_user_level_progress(cur, s.user_id)),
+    ]
+
+
+async def _sample(cur) -> Sample:
+    await cur.execute("SELECT id, username, email, current_level FROM users ORDER BY id LIMIT 1")
+    user_row = await cur.fetchone()
+    await cur.execute("SELECT id, level FROM topics ORDER BY level, order_index LIMIT 1")
+    topic_row = await cur.fetchone()
+    if user_row is None or topic_row is None:
+        raise SystemExit("explain_queries needs at least one user and one topic; seed the database first")
+    return Sample(
+        user_id=user_row['id'], username=user_row['username'], email=user_row['email'],
+        topic_id=topic_row['id'], level=user_row['current_level'] or topic_row['level'],
+        curriculum=await load_snapshot(cur),
+    )
+
+
+async def _relation_sizes(cur) -> Dict[str, float]:
+    await cur.execute("""
+        SELECT relname, reltuples
+        FROM pg_class
+        WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace
+    """)
+    return {row['relname']: row['reltuples'] for row in await cur.fetchall()}
+
+
+async def run(no_seqscan: bool, min_rows: int, verbose: bool) -> int:
+    async with get_db() as conn:
+        cur = conn.cursor()
+        sample = await _sample(cur)
+        sizes = await _relation_sizes(cur)
+        if no_seqscan:
+            await cur.execute("SET LOCAL enable_seqscan = off")
+
+        explaining = ExplainingCursor(cur)
+        for label, call in _scenarios(sample):
+            explaining.label = label
+            await cur.execute("SAVEPOINT explain_scenario")
+            try:
+                await call(explaining)
+            except Exception as e:
+                await cur.execute("ROLLBACK TO SAVEPOINT explain_scenario")
+                explaining.explained.append(ExplainedQuery(label=label, query="", error=f"call failed: {e}"))
+        await conn.rollback()
+
+    flagged = 0
+    for entry in explaining.explained:
+        if entry.plan is not None:
+            for node in _seq_scans(entry.plan["Plan"]):
+                relation = node.get("Relation Name", "?")
+                if no_seqscan or sizes.get(relation, 0) >= min_rows:
+                    entry.seq_scans.append(relation)
+        allowed = entry.label in FULL_SCAN_OK
+        status = "ERROR" if entry.error else ("SEQSCAN" if entry.seq_scans and not allowed else "ok")
+        if status != "ok":
+            flagged += 1
+        if status == "ok" and not verbose:
+            continue
+        timing = f"{entry.plan['Execution Time']:.2f}ms" if entry.plan else "-"
+        detail = entry.error or (", ".join(sorted(set(entry.seq_scans))) if entry.seq_scans else "")
+        print(f"{status:8} {entry.label:50} {timing:>10}  {detail}")
+        if verbose and entry.query:
+            print(f"         {entry.query[:160]}")
+
+    print(f"{len(explaining.explained)} statements explained, {flagged} flagged")
+    return 1 if flagged else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--no-seqscan", action="store_true",
+                        help="disable sequential scans so any remaining one means a missing index")
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="only flag sequential scans on tables with at least this many rows")
+    parser.add_argument("--verbose", action="store_true", help="print every statement, not just flagged ones")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.no_seqscan, args.min_rows, args.verbose)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Top up the quiz bank for every topic in the curriculum.
+
+Usage (from backend/):
+    python -m app.commands.fill_quiz_bank [--target 20] [--batch 5]
+"""
+import argparse
+import asyncio
+import logging
+from app.services.quiz_bank import fill_quiz_bank
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", type=int, default=None, help="questions to keep per topic")
+    parser.add_argument("--batch", type=int, default=None, help="questions to request per LLM call")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    generated = asyncio.run(fill_quiz_bank(args.target, args.batch))
+    print(f"Banked {generated} new questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Rebuild or verify the user_level_progress summary table.
+
+Usage (from backend/):
+    python -m app.commands.rebuild_progress_summary [--check] [--user-id ID]
+"""
+import argparse
+import asyncio
+import sys
+from app.core.database import get_db
+from app.crud.progress_summary import rebuild_user_level_progress, find_user_level_progress_drift
+
+
+async def run(check: bool, user_id) -> int:
+    async with get_db() as conn:
+        cur = conn.cursor()
+        drift = await find_user_level_progress_drift(cur, user_id)
+        for row in drift:
+            print(
+                f"user {row['user_id']} {row['level']}: "
+                f"completed {row['stored_completed']} (expected {row['expected_completed']}), "
+                f"in progress {row['stored_in_progress']} (expected {row['expected_in_progress']})"
+            )
+        if check:
+            print(f"{len(drift)} summary rows out of date")
+            return 1 if drift else 0
+        written = await rebuild_user_level_progress(cur, user_id)
+        print(f"Rebuilt {written} summary rows ({len(drift)} were out of date)")
+        return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="report drift without rewriting (exit 1 if any)")
+    parser.add_argument("--user-id", type=int, default=None, help="only this user")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.check, args.user_id)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Re-score every stored assessment against the current answer key.
+
+Usage (from backend/):
+    python -m app.commands.rescore_assessments [--dry-run] [--update-levels] [--batch-size N]
+"""
+import argparse
+import asyncio
+import sys
+from app.core.database import get_db
+from app.crud.assessment import (
+    get_assessment_answers_page, update_assessment_scores, update_user_levels
+)
+from app.services.assessment_key import load_answer_key
+
+
+async def run(dry_run: bool, update_levels: bool, batch_size: int) -> int:
+    async with get_db() as conn:
+        answer_key = await load_answer_key(conn.cursor())
+    if answer_key.max_points == 0:
+        print("No assessment questions available")
+        return 1
+    print(f"Answer key version {answer_key.version}: {answer_key.total_questions} questions, "
+          f"{answer_key.max_points} points")
+
+    scanned = changed = levels_changed = 0
+    after_id = 0
+    while True:
+        async with get_db() as conn:
+            cur = conn.cursor()
+            page = await get_assessment_answers_page(cur, after_id, batch_size)
+            if not page:
+                break
+            after_id = page[-1]['id']
+            scanned += len(page)
+
+            updates = []
+            for row in page:
+                answers = row['answers'] or []
+                score, level = answer_key.grade(
+                    (answer.get('question_id'), answer.get('answer')) for answer in answers
+                )
+                if (score, answer_key.total_questions, level) != (
+                        row['score'], row['total_questions'], row['assigned_level']):
+                    updates.append((row['id'], row['user_id'], score, level))
+
+            changed += len(updates)
+            if dry_run or not updates:
+                continue
+            await update_assessment_scores(
+                cur, [(id_, score, answer_key.total_questions, level) for id_, _, score, level in updates]
+            )
+            if update_levels:
+                levels_changed += await update_user_levels(
+                    cur, [(user_id, level) for _, user_id, _, level in updates]
+                )
+
+    action = "would change" if dry_run else "changed"
+    print(f"Scanned {scanned} assessments, {action} {changed}"
+          + (f", moved {levels_changed} users to a new level" if update_levels and not dry_run else ""))
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report how many results would change")
+    parser.add_argument("--update-levels", action="store_true",
+                        help="also move users to their re-scored level (changes their learning path)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="assessments per transaction")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.dry_run, args.update_levels, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
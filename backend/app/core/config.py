@@ -8,12 +8,54 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
     DATABASE_USER: str
     DATABASE_PASSWORD: str
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_MAX_IDLE: float = 300.0  # seconds before an idle connection is closed
+    DB_POOL_MAX_LIFETIME: float = 3600.0  # seconds before a connection is recycled
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    CURRICULUM_REFRESH_SECONDS: float = 30.0  # content_version poll interval; 0 disables
+    ASSESSMENT_KEY_REFRESH_SECONDS: float = 30.0  # assessment_version poll interval; 0 disables
+    PAYLOAD_CACHE_MAX_ENTRIES: int = 2000  # precomputed questions/topic payloads kept per worker
+    PAYLOAD_CACHE_MAX_AGE: int = 60  # Cache-Control max-age for ETag-validated payloads
+    FAST_JSON_RESPONSES: bool = False  # encode the largest responses with orjson, skipping response_model validation
+    SERVER_TIMING_ENABLED: bool = True  # add per-request DB timings as a Server-Timing header
+    SLOW_QUERY_LOG_MS: float = 500.0  # log requests whose slowest SQL statement exceeds this; 0 disables
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of requests to profile (needs pyinstrument); 0 disables
+    PROFILING_ADMIN_TOKEN: str = ""  # requests sending this in X-Profile are profiled; empty disables
+    PROFILING_OUTPUT_DIR: str = "profiles"  # where speedscope files are written
+    PROFILING_INTERVAL: float = 0.001  # sampling interval in seconds
+    HEARTBEAT_FLUSH_SECONDS: float = 10.0  # how often buffered time-spent heartbeats are written
+    HEARTBEAT_MAX_PENDING: int = 1000  # flush early once this many (user, topic) pairs are buffered
+    HEARTBEAT_MAX_REQUEUE: int = 10000  # pairs kept for retry after a failed flush; the rest is dropped
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400  # KiB
+    ARGON2_PARALLELISM: int = 8
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # hashes allowed to wait before returning 503
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # a deleted or changed user keeps authenticating for up to this long
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False  # skip the users lookup; deleted users then pass until the token expires
     OPENAI_API_KEY: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
     GEMINI_MODEL: Optional[str] = "gemini-1.5-flash"
+    LLM_CACHE_BACKEND: str = "memory"  # "memory", "postgres" or "none"
+    LLM_CACHE_TTL_SECONDS: float = 86400.0
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    QUIZ_BANK_WORKER_ENABLED: bool = False  # enable on one instance only
+    QUIZ_BANK_TARGET_SIZE: int = 20  # questions kept per topic
+    QUIZ_BANK_BATCH_SIZE: int = 5  # questions requested per LLM call
+    QUIZ_BANK_REFILL_SECONDS: float = 3600.0
+    LLM_EXECUTOR_WORKERS: int = 8  # threads dedicated to blocking Gemini calls
+    LLM_MAX_CONCURRENCY: int = 8  # LLM calls in flight per process
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 5.0  # wait for a free slot before returning 503
+    LLM_TIMEOUT_SECONDS: float = 30.0  # per-call deadline
+    LLM_USER_RATE_PER_MINUTE: float = 10.0  # 0 disables per-user rate limiting
+    LLM_USER_BURST: int = 5
+    LLM_BREAKER_FAILURES: int = 5  # consecutive failures before the circuit opens
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
     
     @property
     def database_url(self) -> str:
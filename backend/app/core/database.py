@@ -1,41 +1,200 @@
-import psycopg
 from psycopg.rows import dict_row
-from contextlib import contextmanager
+from psycopg_pool import AsyncConnectionPool
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from app.core.config import settings
-from typing import Generator
-from psycopg import Connection as PGConnection
+from typing import AsyncGenerator, Callable, List, Optional, Dict, Any
+from psycopg import AsyncConnection as PGConnection, AsyncCursor
+import logging
+import time
 
-def get_db_connection() -> PGConnection:
-    """Create a database connection.
+logger = logging.getLogger(__name__)
 
-    Returns a psycopg2 connection configured with a dict-like cursor.
+_pool: Optional[AsyncConnectionPool] = None
+
+# How long callers keep a connection checked out (from acquire to release)
+_hold_stats = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+@dataclass
+class RequestDBStats:
+    """Database work done on behalf of one HTTP request."""
+    statements: int = 0
+    db_seconds: float = 0.0
+    acquire_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+
+
+# Set by the request metrics middleware; None outside a request (scripts, background tasks)
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+# Called with the duration of every statement, e.g. to feed a histogram
+statement_observers: List[Callable[[float], None]] = []
+
+
+def start_request_stats() -> RequestDBStats:
+    """Start collecting database stats for the current request context."""
+    stats = RequestDBStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def _record_statement(query: Any, seconds: float) -> None:
+    for observer in statement_observers:
+        observer(seconds)
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_seconds += seconds
+    if seconds > stats.slowest_seconds:
+        stats.slowest_seconds = seconds
+        stats.slowest_statement = " ".join(str(query).split())[:300]
+
+
+def _record_acquire(seconds: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.acquire_seconds += seconds
+
+
+class InstrumentedCursor(AsyncCursor):
+    """Cursor that times every statement and counts it against the current request."""
+
+    async def execute(self, query, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            _record_statement(query, time.perf_counter() - started)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        finally:
+            _record_statement(query, time.perf_counter() - started)
+
+
+def _connection_kwargs() -> Dict[str, Any]:
+    return {
+        "host": settings.DATABASE_HOST,
+        "port": settings.DATABASE_PORT,
+        "dbname": settings.DATABASE_NAME,
+        "user": settings.DATABASE_USER,
+        "password": settings.DATABASE_PASSWORD,
+        "connect_timeout": 10,
+        "application_name": "adaptive-learning-api",
+        "row_factory": dict_row,
+        "cursor_factory": InstrumentedCursor,
+    }
+
+
+async def get_db_connection() -> PGConnection:
+    """Create a standalone async database connection.
+
+    Returns a psycopg connection configured with a dict-like cursor.
     A small connect timeout and application_name are set for resilience and observability.
+    Request handlers should use get_db() instead, which borrows from the pool.
     """
-    conn = psycopg.connect(
-        host=settings.DATABASE_HOST,
-        port=settings.DATABASE_PORT,
-        dbname=settings.DATABASE_NAME,
-        user=settings.DATABASE_USER,
-        password=settings.DATABASE_PASSWORD,
-        connect_timeout=10,
-        application_name="adaptive-learning-api",
-        row_factory=dict_row,
+    return await PGConnection.connect(**_connection_kwargs())
+
+
+async def open_pool() -> AsyncConnectionPool:
+    """Create and open the application connection pool.
+
+    Called from the FastAPI startup hook. Connections are health-checked on
+    checkout, recycled after DB_POOL_MAX_LIFETIME seconds and closed after
+    DB_POOL_MAX_IDLE seconds of inactivity (down to DB_POOL_MIN_SIZE).
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    _pool = AsyncConnectionPool(
+        kwargs=_connection_kwargs(),
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        max_idle=settings.DB_POOL_MAX_IDLE,
+        max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+        timeout=settings.DB_POOL_TIMEOUT,
+        check=AsyncConnectionPool.check_connection,
+        name="adaptive-learning-api",
+        open=False,
     )
-    return conn
+    # Don't block startup on the database; the pool keeps retrying in the background
+    await _pool.open(wait=False)
+    logger.info(
+        f"Database pool opened (min_size={settings.DB_POOL_MIN_SIZE}, max_size={settings.DB_POOL_MAX_SIZE})"
+    )
+    return _pool
+
 
-@contextmanager
-def get_db() -> Generator[PGConnection, None, None]:
-    """Context manager for database connections.
+async def close_pool() -> None:
+    """Close the application connection pool, if open."""
+    global _pool
+    if _pool is None:
+        return
+    await _pool.close()
+    _pool = None
+    logger.info("Database pool closed")
 
-    Commits on success, rolls back on error, and always closes the connection.
+
+def _record_hold(seconds: float) -> None:
+    ms = seconds * 1000
+    _hold_stats["count"] += 1
+    _hold_stats["total_ms"] += ms
+    if ms > _hold_stats["max_ms"]:
+        _hold_stats["max_ms"] = ms
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Return pool counters, including time spent waiting for a connection.
+
+    See psycopg_pool's documentation for the meaning of the pool keys
+    (e.g. requests_waiting, requests_wait_ms, pool_available). The
+    connections_held_* keys report how long get_db() callers kept a connection.
     """
-    conn = get_db_connection()
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-       
\ No newline at end of file
+    stats: Dict[str, Any] = _pool.get_stats() if _pool is not None else {}
+    count = _hold_stats["count"]
+    stats.update({
+        "connections_held": count,
+        "connections_held_avg_ms": round(_hold_stats["total_ms"] / count, 2) if count else 0,
+        "connections_held_max_ms": round(_hold_stats["max_ms"], 2),
+    })
+    return stats
+
+
+@asynccontextmanager
+async def get_db() -> AsyncGenerator[PGConnection, None]:
+    """Async context manager for database connections.
+
+    Borrows a connection from the pool, commits on success, rolls back on error,
+    and returns it to the pool. Falls back to a one-off connection when the pool
+    has not been opened (e.g. scripts run outside the app).
+    """
+    started = time.perf_counter()
+    if _pool is None:
+        conn = await get_db_connection()
+        acquired = time.perf_counter()
+        _record_acquire(acquired - started)
+        try:
+            yield conn
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            await conn.close()
+            _record_hold(time.perf_counter() - acquired)
+        return
+
+    # The pool's context manager commits on success and rolls back on error
+    async with _pool.connection() as conn:
+        acquired = time.perf_counter()
+        _record_acquire(acquired - started)
+        try:
+            yield conn
+        finally:
+            _record_hold(time.perf_counter() - acquired)
@@ -2,13 +2,21 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.security import verify_token
 from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
 from typing import Dict, Any
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+# Decoded payloads of verified tokens (never cached past the token's own expiry)
+_token_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+# User rows keyed by user ID; changed or deleted users are seen after AUTH_CACHE_TTL_SECONDS
+_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """
     Dependency to get current authenticated user from JWT token
@@ -18,15 +26,21 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         token = credentials.credentials
         logger.debug(f"Received authentication token for verification")
         
-        payload = verify_token(token)
-        
+        payload = _token_cache.get(token)
         if payload is None:
-            logger.warning("Token verification failed - invalid or expired token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            payload = verify_token(token)
+            
+            if payload is None:
+                logger.warning("Token verification failed - invalid or expired token")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired token",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            
+            exp = payload.get("exp")
+            if exp is not None:
+                _token_cache.set(token, payload, ttl=exp - time.time())
         
         sub = payload.get("sub")
         if sub is None:
@@ -47,24 +61,31 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Fetch user from database
-        with get_db() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, username, email FROM users WHERE id = %s",
-                (user_id,)
-            )
-            user = cur.fetchone()
+        # Trust user fields embedded in the token when enabled (no DB round trip)
+        if settings.AUTH_TRUST_TOKEN_CLAIMS and payload.get("username") and payload.get("email"):
+            return {"id": user_id, "username": payload["username"], "email": payload["email"]}
         
+        user = _user_cache.get(user_id)
         if user is None:
-            logger.warning(f"User not found in database: user_id={user_id}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
+            # Fetch user from database
+            async with get_db() as conn:
+                cur = conn.cursor()
+                await cur.execute(
+                    "SELECT id, username, email FROM users WHERE id = %s",
+                    (user_id,)
+                )
+                user = await cur.fetchone()
+            
+            if user is None:
+                logger.warning(f"User not found in database: user_id={user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            _user_cache.set(user_id, user)
         
         logger.debug(f"User authenticated successfully: {user['username']}")
-        return user
+        return dict(user)
         
     except HTTPException:
         raise
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+import hashlib
+import json
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+import orjson
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    """A response payload serialised once, with a strong ETag over its bytes."""
+    data: Any
+    body: bytes
+    etag: str
+
+
+def build_payload(data: Any) -> CachedPayload:
+    if settings.FAST_JSON_RESPONSES:
+        body = orjson.dumps(data, default=str)
+    else:
+        body = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return CachedPayload(data=data, body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+# Keys include the content version, so stale payloads are never served and age out of the LRU
+_payloads = TTLCache(maxsize=settings.PAYLOAD_CACHE_MAX_ENTRIES, ttl=86400)
+
+
+def get_cached_payload(key: Hashable) -> Optional[CachedPayload]:
+    return _payloads.get(key)
+
+
+def cache_payload(key: Hashable, data: Any) -> CachedPayload:
+    payload = build_payload(data)
+    _payloads.set(key, payload)
+    return payload
+
+
+def get_or_build_payload(key: Hashable, build: Callable[[], Any]) -> CachedPayload:
+    """Return the cached payload for key, building and caching it on a miss."""
+    payload = _payloads.get(key)
+    if payload is None:
+        payload = cache_payload(key, build())
+    return payload
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def payload_response(payload: CachedPayload, if_none_match: Optional[str] = None) -> Response:
+    """Send a cached payload, or 304 Not Modified if the client already has it."""
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"private, max-age={settings.PAYLOAD_CACHE_MAX_AGE}",
+    }
+    if etag_matches(if_none_match, payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+def fast_json_response(data: Any) -> Optional[Response]:
+    """Encode plain data with orjson when FAST_JSON_RESPONSES is on, else None.
+
+    Returning a Response from a route skips FastAPI's response_model validation
+    and stdlib encoding, so data must already match the declared schema.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return None
+    return ORJSONResponse(data)
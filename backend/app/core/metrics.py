@@ -0,0 +1,179 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import threading
+import time
+from starlette.datastructures import MutableHeaders
+from app.core.config import settings
+from app.core.database import start_request_stats, statement_observers, RequestDBStats
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Minimal Prometheus histogram (per-process, thread-safe)."""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float], labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[labelvalues] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        for labelvalues, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _labels(self.labelnames, labelvalues, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            inf = _labels(self.labelnames, labelvalues, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}")
+        return lines
+
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by route template.",
+    _LATENCY_BUCKETS, ("method", "route", "status"),
+)
+request_db_statements = Histogram(
+    "http_request_db_statements", "SQL statements issued per request.",
+    (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100), ("method", "route"),
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Total time spent executing SQL per request.",
+    _DB_BUCKETS, ("method", "route"),
+)
+request_db_acquire_seconds = Histogram(
+    "http_request_db_acquire_seconds", "Time spent waiting for pooled connections per request.",
+    _DB_BUCKETS, ("method", "route"),
+)
+db_statement_seconds = Histogram(
+    "db_statement_duration_seconds", "Duration of individual SQL statements, including background work.",
+    _DB_BUCKETS,
+)
+statement_observers.append(db_statement_seconds.observe)
+
+HISTOGRAMS = (request_duration, request_db_statements, request_db_seconds,
+              request_db_acquire_seconds, db_statement_seconds)
+
+# Gauge families rendered at scrape time: name -> (help, callable returning {suffix: value})
+_gauge_sources: List[Tuple[str, str, Callable[[], Dict[str, Any]]]] = []
+
+
+def register_gauges(prefix: str, help_text: str, source: Callable[[], Dict[str, Any]]) -> None:
+    """Expose every numeric value of source() as a gauge named <prefix>_<key>."""
+    _gauge_sources.append((prefix, help_text, source))
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format (this worker only)."""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for prefix, help_text, source in _gauge_sources:
+        try:
+            values = source()
+        except Exception as e:
+            logger.warning(f"Metrics source {prefix} failed: {e}")
+            continue
+        for key, value in values.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{prefix}_{key}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(stats: RequestDBStats, total_seconds: Optional[float] = None) -> str:
+    """Server-Timing header value for a request's database work (durations in ms)."""
+    parts = [
+        f'db;desc="{stats.statements} statements";dur={stats.db_seconds * 1000:.2f}',
+        f"db-acquire;dur={stats.acquire_seconds * 1000:.2f}",
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}",
+    ]
+    if total_seconds is not None:
+        parts.append(f"app;dur={total_seconds * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """Collect per-request SQL statement count and timings.
+
+    Adds a Server-Timing header (when SERVER_TIMING_ENABLED), feeds the request
+    histograms exposed on /metrics and logs requests whose slowest statement
+    exceeds SLOW_QUERY_LOG_MS. Plain ASGI so streamed responses are not buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request_stats()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            request_duration.observe(elapsed, method, route, str(status_code))
+            request_db_statements.observe(stats.statements, method, route)
+            request_db_seconds.observe(stats.db_seconds, method, route)
+            request_db_acquire_seconds.observe(stats.acquire_seconds, method, route)
+            if settings.SLOW_QUERY_LOG_MS and stats.slowest_seconds * 1000 >= settings.SLOW_QUERY_LOG_MS:
+                logger.warning(
+                    f"Slow SQL in {method} {route}: {stats.slowest_seconds * 1000:.1f}ms "
+                    f"({stats.statements} statements) {stats.slowest_statement}"
+                )
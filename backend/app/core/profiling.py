@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import asyncio
+import hmac
+import logging
+import random
+import re
+import time
+from app.core.config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # optional: pip install pyinstrument
+    Profiler = None
+    SpeedscopeRenderer = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _should_profile(scope) -> bool:
+    token = settings.PROFILING_ADMIN_TOKEN
+    if token:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                if hmac.compare_digest(value, token.encode()):
+                    return True
+                break
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def _profile_path(method: str, route: str, elapsed: float) -> Path:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    return Path(settings.PROFILING_OUTPUT_DIR) / f"{stamp}_{method}_{slug}_{elapsed * 1000:.0f}ms.speedscope.json"
+
+
+def _write_profile(profiler, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(profiler.output(SpeedscopeRenderer()))
+
+
+class ProfilingMiddleware:
+    """Profile selected requests with pyinstrument and save speedscope files.
+
+    A request is profiled when its X-Profile header matches PROFILING_ADMIN_TOKEN,
+    or at random with probability PROFILING_SAMPLE_RATE. Files are written to
+    PROFILING_OUTPUT_DIR, named with the time, route template and latency; open
+    them at https://www.speedscope.app. Work sent to thread pools (password
+    hashing, blocking LLM calls) shows up as time awaiting the executor.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        if Profiler is None and (settings.PROFILING_SAMPLE_RATE > 0 or settings.PROFILING_ADMIN_TOKEN):
+            logger.warning("Request profiling is configured but pyinstrument is not installed")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or Profiler is None or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            path = _profile_path(scope["method"], route, elapsed)
+            try:
+                await asyncio.to_thread(_write_profile, profiler, path)
+                logger.info(f"Profile for {scope['method']} {route} ({elapsed * 1000:.0f}ms) saved to {path}")
+            except Exception as e:
+                logger.warning(f"Could not save profile for {route}: {e}")
@@ -1,6 +1,8 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Callable, TypeVar
+import asyncio
 from jose import jwt
 from jose.exceptions import ExpiredSignatureError, JWTError
 from app.core.config import settings
@@ -8,7 +10,27 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# argon2 is CPU-bound and releases the GIL, so a small dedicated thread pool keeps
+# it off the event loop without competing with the default executor.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_in_flight = 0
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing pool and its queue are full."""
 
 def hash_password(password: str) -> str:
     """Hash a password using argon2"""
@@ -18,6 +40,27 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_hashing(func: Callable[..., T], *args) -> T:
+    """Run a hashing call on the dedicated pool, rejecting work beyond the queue limit."""
+    global _hash_in_flight
+    if _hash_in_flight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE:
+        logger.warning("Password hashing pool saturated, rejecting request")
+        raise PasswordHashingBusy()
+    _hash_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_in_flight -= 1
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    return await _run_hashing(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
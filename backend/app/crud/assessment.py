@@ -1,14 +1,29 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 
-def get_assessment_questions(cur) -> List[Dict]:
+async def get_assessment_questions(cur) -> List[Dict]:
     """Get all assessment questions"""
-    cur.execute("""
+    await cur.execute("""
         SELECT id, question_text, question_type, options, order_index
         FROM assessment_questions
         ORDER BY order_index
     """)
-    return cur.fetchall()
+    return await cur.fetchall()
+
+async def get_assessment_version(cur) -> int:
+    """Get the current assessment answer key version"""
+    await cur.execute("SELECT assessment_version FROM content_version")
+    result = await cur.fetchone()
+    return result['assessment_version'] if result else 0
+
+async def get_answer_key_rows(cur) -> List[Dict]:
+    """Get the correct answer and points for every assessment question"""
+    await cur.execute("""
+        SELECT id, correct_answer, points
+        FROM assessment_questions
+        ORDER BY id
+    """)
+    return await cur.fetchall()
 
 def calculate_user_level(score: int, total_points: int) -> str:
     """Determine user level based on percentage of total points.
@@ -28,50 +43,87 @@ def calculate_user_level(score: int, total_points: int) -> str:
     else:
         return "advanced"
 
-def save_assessment_result(cur, user_id: int, score: int, total_questions: int, 
+async def save_assessment_result(cur, user_id: int, score: int, total_questions: int, 
                            assigned_level: str, answers: List[Dict]):
-    """Save user assessment result"""
-    # Check if user already has assessment
-    cur.execute("SELECT id FROM user_assessments WHERE user_id = %s", (user_id,))
-    existing = cur.fetchone()
-    
-    if existing:
-        # Update existing
-        cur.execute("""
-            UPDATE user_assessments
-            SET score = %s, total_questions = %s, assigned_level = %s,
-                answers = %s, completed_at = CURRENT_TIMESTAMP
-            WHERE user_id = %s
-        """, (score, total_questions, assigned_level, json.dumps(answers), user_id))
-    else:
-        # Insert new
-        cur.execute("""
+    """Save user assessment result and assign the user's level in one statement.
+    Relies on the unique constraint on user_assessments.user_id, so concurrent
+    resubmits overwrite the same row instead of inserting duplicates.
+    """
+    await cur.execute("""
+        WITH saved AS (
             INSERT INTO user_assessments (user_id, score, total_questions, assigned_level, answers)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (user_id, score, total_questions, assigned_level, json.dumps(answers)))
-    
-    # Update user's level and assessment status
-    cur.execute("""
-        UPDATE users
-        SET current_level = %s, has_completed_assessment = TRUE
-        WHERE id = %s
-    """, (assigned_level, user_id))
+            VALUES (%(user_id)s, %(score)s, %(total_questions)s, %(assigned_level)s, %(answers)s)
+            ON CONFLICT (user_id) DO UPDATE
+            SET score = EXCLUDED.score, total_questions = EXCLUDED.total_questions,
+                assigned_level = EXCLUDED.assigned_level, answers = EXCLUDED.answers,
+                completed_at = CURRENT_TIMESTAMP
+            RETURNING user_id, assigned_level
+        )
+        UPDATE users u
+        SET current_level = saved.assigned_level, has_completed_assessment = TRUE
+        FROM saved
+        WHERE u.id = saved.user_id
+    """, {
+        "user_id": user_id,
+        "score": score,
+        "total_questions": total_questions,
+        "assigned_level": assigned_level,
+        "answers": json.dumps(answers),
+    })
 
-def get_user_assessment(cur, user_id: int) -> Optional[Dict]:
+async def get_user_assessment(cur, user_id: int) -> Optional[Dict]:
     """Get user's assessment result"""
-    cur.execute("""
+    await cur.execute("""
         SELECT score, total_questions, assigned_level, completed_at
         FROM user_assessments
         WHERE user_id = %s
     """, (user_id,))
-    return cur.fetchone()
+    return await cur.fetchone()
 
-def has_completed_assessment(cur, user_id: int) -> bool:
+async def has_completed_assessment(cur, user_id: int) -> bool:
     """Check if user has completed assessment"""
-    cur.execute("""
+    await cur.execute("""
         SELECT has_completed_assessment
         FROM users
         WHERE id = %s
     """, (user_id,))
-    result = cur.fetchone()
-    return result['has_completed_assessment'] if result else False
\ No newline at end of file
+    result = await cur.fetchone()
+    return result['has_completed_assessment'] if result else False
+
+async def get_assessment_answers_page(cur, after_id: int, limit: int) -> List[Dict]:
+    """Get stored assessment answers in id order, starting after after_id"""
+    await cur.execute("""
+        SELECT id, user_id, score, total_questions, assigned_level, answers
+        FROM user_assessments
+        WHERE id > %s
+        ORDER BY id
+        LIMIT %s
+    """, (after_id, limit))
+    return await cur.fetchall()
+
+async def update_assessment_scores(cur, rows: List[Tuple[int, int, int, str]]) -> int:
+    """Apply many (assessment_id, score, total_questions, assigned_level) updates in one statement"""
+    if not rows:
+        return 0
+    ids, scores, totals, levels = (list(column) for column in zip(*rows))
+    await cur.execute("""
+        UPDATE user_assessments ua
+        SET score = v.score, total_questions = v.total_questions, assigned_level = v.assigned_level
+        FROM unnest(%s::integer[], %s::integer[], %s::integer[], %s::text[])
+            AS v(id, score, total_questions, assigned_level)
+        WHERE ua.id = v.id
+    """, (ids, scores, totals, levels))
+    return cur.rowcount
+
+async def update_user_levels(cur, rows: List[Tuple[int, str]]) -> int:
+    """Set current_level for many (user_id, level) pairs of users who completed the assessment"""
+    if not rows:
+        return 0
+    user_ids, levels = (list(column) for column in zip(*rows))
+    await cur.execute("""
+        UPDATE users u
+        SET current_level = v.level
+        FROM unnest(%s::integer[], %s::text[]) AS v(user_id, level)
+        WHERE u.id = v.user_id AND u.has_completed_assessment AND u.current_level IS DISTINCT FROM v.level
+    """, (user_ids, levels))
+    return cur.rowcount
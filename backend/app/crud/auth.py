@@ -1,17 +1,17 @@
 from typing import Optional, Dict
 
-def get_user_by_username(cur, username: str) -> Optional[Dict]:
+async def get_user_by_username(cur, username: str) -> Optional[Dict]:
     """Get user by username"""
-    cur.execute(
+    await cur.execute(
         "SELECT id, username, email, password_hash FROM users WHERE username = %s",
         (username,)
     )
-    return cur.fetchone()
+    return await cur.fetchone()
 
-def get_user_by_email(cur, email: str) -> Optional[Dict]:
+async def get_user_by_email(cur, email: str) -> Optional[Dict]:
     """Get user by email"""
-    cur.execute(
+    await cur.execute(
         "SELECT id, username, email, password_hash FROM users WHERE LOWER(email) = LOWER(%s) LIMIT 1",
         (email,)
     )
-    return cur.fetchone()
\ No newline at end of file
+    return await cur.fetchone()
\ No newline at end of file
@@ -1,70 +1,158 @@
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 
-def get_user_level(cur, user_id: int) -> str:
+async def get_user_level(cur, user_id: int) -> str:
     """Get user's assigned level"""
-    cur.execute("SELECT current_level FROM users WHERE id = %s", (user_id,))
-    result = cur.fetchone()
+    await cur.execute("SELECT current_level FROM users WHERE id = %s", (user_id,))
+    result = await cur.fetchone()
     return result['current_level'] if result else 'beginner'
 
-def get_topics_by_level(cur, level: str) -> List[Dict]:
+async def get_topics_by_level(cur, level: str) -> List[Dict]:
     """Get all topics for a specific level"""
-    cur.execute("""
+    await cur.execute("""
         SELECT id, title, description, content, difficulty_level, 
                estimated_hours, order_index, level
         FROM topics
         WHERE level = %s
         ORDER BY order_index
     """, (level,))
-    return cur.fetchall()
+    return await cur.fetchall()
 
-def get_topic_prerequisites(cur, topic_id: int) -> List[int]:
+async def get_topic_prerequisites(cur, topic_id: int) -> List[int]:
     """Get prerequisite topic IDs for a topic (only within the same level)"""
-    cur.execute("""
+    await cur.execute("""
         SELECT tp.prerequisite_topic_id
         FROM topic_prerequisites tp
         INNER JOIN topics t1 ON tp.topic_id = t1.id
         INNER JOIN topics t2 ON tp.prerequisite_topic_id = t2.id
         WHERE tp.topic_id = %s AND t1.level = t2.level
     """, (topic_id,))
-    return [row['prerequisite_topic_id'] for row in cur.fetchall()]
+    return [row['prerequisite_topic_id'] for row in await cur.fetchall()]
 
-def get_user_progress_for_topic(cur, user_id: int, topic_id: int) -> Optional[Dict]:
+async def get_user_progress_for_topic(cur, user_id: int, topic_id: int) -> Optional[Dict]:
     """Get user's progress for a specific topic"""
-    cur.execute("""
+    await cur.execute("""
         SELECT status, progress_percentage, time_spent_minutes, last_accessed
         FROM user_progress
         WHERE user_id = %s AND topic_id = %s
     """, (user_id, topic_id))
-    return cur.fetchone()
+    return await cur.fetchone()
 
-def get_user_completed_topics(cur, user_id: int) -> List[int]:
+async def get_user_completed_topics(cur, user_id: int) -> List[int]:
     """Get list of completed topic IDs for a user"""
-    cur.execute("""
+    await cur.execute("""
         SELECT topic_id
         FROM user_progress
         WHERE user_id = %s AND status = 'completed'
     """, (user_id,))
-    return [row['topic_id'] for row in cur.fetchall()]
+    return [row['topic_id'] for row in await cur.fetchall()]
 
-def determine_topic_status(topic_id: int, prerequisites: List[int], 
-                          completed_topics: List[int], user_progress: Optional[Dict]) -> str:
-    """Determine if topic is locked, available, in_progress, or completed"""
+async def get_user_learning_context(cur, user_id: int) -> Dict:
+    """Get the user's level, progress counts at that level, total topic count and
+    current topic in one query (counts come from the user_level_progress summary)"""
+    await cur.execute("""
+        SELECT u.current_level AS level,
+               COALESCE(ulp.completed_count, 0) AS completed_count,
+               COALESCE(ulp.in_progress_count, 0) AS in_progress_count,
+               (SELECT COUNT(*)
+                FROM topics t
+                WHERE t.level = u.current_level) AS total_count,
+               (SELECT t.title
+                FROM user_progress up
+                JOIN topics t ON up.topic_id = t.id
+                WHERE up.user_id = u.id AND up.status = 'in_progress'
+                ORDER BY up.last_accessed DESC
+                LIMIT 1) AS current_topic
+        FROM users u
+        LEFT JOIN user_level_progress ulp ON ulp.user_id = u.id AND ulp.level = u.current_level
+        WHERE u.id = %s
+    """, (user_id,))
+    result = await cur.fetchone()
+    if not result:
+        return {
+            'level': 'beginner', 'completed_count': 0, 'in_progress_count': 0,
+            'total_count': 0, 'current_topic': None,
+        }
+    return {**result, 'level': result['level'] or 'beginner'}
+
+def determine_topic_status(prerequisites_met: bool, user_progress: Optional[Dict]) -> str:
+    """Determine if topic is locked, available, in_progress, or completed
+    prerequisites_met: whether every prerequisite is completed (see CompletionSet.satisfies)
+    """
     # If user has progress, return that status
     if user_progress:
         return user_progress['status']
     
-    # Check if all prerequisites are completed
-    if prerequisites:
-        all_prereqs_completed = all(prereq in completed_topics for prereq in prerequisites)
-        if not all_prereqs_completed:
-            return 'locked'
-    
     # No prerequisites or all completed
-    return 'available'
+    return 'available' if prerequisites_met else 'locked'
+
+async def get_user_progress_rows(cur, user_id: int, topic_ids: List[int]) -> Dict[int, Dict]:
+    """Get the user's progress rows for a set of topics, keyed by topic ID"""
+    await cur.execute("""
+        SELECT topic_id, status, progress_percentage, time_spent_minutes, last_accessed
+        FROM user_progress
+        WHERE user_id = %s AND topic_id = ANY(%s)
+    """, (user_id, list(topic_ids)))
+    return {row['topic_id']: row for row in await cur.fetchall()}
+
+async def build_learning_path(cur, user_id: int, curriculum) -> Dict:
+    """Build the user's learning path from the curriculum snapshot.
+
+    Topics and same-level prerequisites come from the in-memory snapshot; only the
+    user's level and their progress rows for that level are queried. Prerequisite
+    checks for the whole level are done at once against the user's completion bitset.
+    """
+    user_level = await get_user_level(cur, user_id)
+    level_topics = curriculum.topics_for_level(user_level)
+    progress_rows = await get_user_progress_rows(cur, user_id, [t['id'] for t in level_topics])
+
+    # Prerequisites are same-level only, so completions at this level are sufficient
+    completed = curriculum.completion_set(
+        topic_id for topic_id, row in progress_rows.items() if row['status'] == 'completed'
+    )
+    unlocked = curriculum.unlocked_mask(user_level, completed)
+
+    topics = []
+    completed_count = 0
+    in_progress_count = 0
+    for topic in level_topics:
+        user_progress = progress_rows.get(topic['id'])
+        prerequisites_met = bool(unlocked & curriculum.topic_bit(topic['id']))
+        status = determine_topic_status(prerequisites_met, user_progress)
+
+        if status == 'completed':
+            completed_count += 1
+        elif status == 'in_progress':
+            in_progress_count += 1
+
+        topics.append({
+            'id': topic['id'],
+            'title': topic['title'],
+            'description': topic['description'],
+            'difficulty_level': topic['difficulty_level'],
+            'estimated_hours': float(topic['estimated_hours']),
+            'order_index': topic['order_index'],
+            'level': topic['level'],
+            'status': status,
+            'progress_percentage': float(user_progress['progress_percentage']) if user_progress else 0,
+            'prerequisites': list(curriculum.prerequisites_for(topic['id'])),
+        })
+
+    total_topics = len(topics)
+    overall_progress = (completed_count / total_topics * 100) if total_topics > 0 else 0
+
+    return {
+        'user_level': user_level,
+        'total_topics': total_topics,
+        'completed_topics': completed_count,
+        'in_progress_topics': in_progress_count,
+        'progress_percentage': round(overall_progress, 2),
+        'topics': topics,
+    }
 
-def start_topic(cur, user_id: int, topic_id: int):
+async def start_topic(cur, user_id: int, topic_id: int):
     """Mark a topic as started for a user"""
-    cur.execute("""
+    await cur.execute("""
         INSERT INTO user_progress (user_id, topic_id, status, last_accessed)
         VALUES (%s, %s, 'in_progress', CURRENT_TIMESTAMP)
         ON CONFLICT (user_id, topic_id) 
@@ -73,9 +161,9 @@ def start_topic(cur, user_id: int, topic_id: int):
             last_accessed = CURRENT_TIMESTAMP
     """, (user_id, topic_id))
 
-def complete_topic(cur, user_id: int, topic_id: int):
+async def complete_topic(cur, user_id: int, topic_id: int):
     """Mark a topic as completed"""
-    cur.execute("""
+    await cur.execute("""
         UPDATE user_progress
         SET status = 'completed',
             progress_percentage = 100,
@@ -83,9 +171,9 @@ def complete_topic(cur, user_id: int, topic_id: int):
         WHERE user_id = %s AND topic_id = %s
     """, (user_id, topic_id))
 
-def update_topic_progress(cur, user_id: int, topic_id: int, progress: int, time_spent: int):
+async def update_topic_progress(cur, user_id: int, topic_id: int, progress: int, time_spent: int):
     """Update progress for a topic"""
-    cur.execute("""
+    await cur.execute("""
         UPDATE user_progress
         SET progress_percentage = %s,
             time_spent_minutes = time_spent_minutes + %s,
@@ -93,32 +181,147 @@ def update_topic_progress(cur, user_id: int, topic_id: int, progress: int, time_
         WHERE user_id = %s AND topic_id = %s
     """, (progress, time_spent, user_id, topic_id))
 
-def get_topic_detail(cur, topic_id: int) -> Optional[Dict]:
+async def update_topic_progress_batch(cur, user_id: int, events: List[Tuple[int, int, int, datetime]]) -> List[int]:
+    """Apply many (topic_id, progress, time_spent, client_ts) events in one statement
+    Each event's time is added once: applied events are recorded in progress_sync_events
+    and skipped when resent. Progress only moves to the latest event newer than the row's
+    last_client_ts, so late batches cannot roll it back. Rows are locked in primary-key
+    order. Events must be unique per (topic_id, client_ts). Returns the topic IDs updated.
+    """
+    if not events:
+        return []
+    topic_ids, progress, time_spent, client_ts = (list(column) for column in zip(*events))
+    await cur.execute("""
+        WITH v AS (
+            SELECT *
+            FROM unnest(%s::integer[], %s::integer[], %s::integer[], %s::timestamptz[])
+                AS v(topic_id, progress, time_spent, client_ts)
+        ),
+        applied AS (
+            INSERT INTO progress_sync_events (user_id, topic_id, client_ts)
+            SELECT up.user_id, v.topic_id, v.client_ts
+            FROM v
+            JOIN user_progress up ON up.user_id = %s AND up.topic_id = v.topic_id
+            ORDER BY v.topic_id, v.client_ts
+            ON CONFLICT DO NOTHING
+            RETURNING topic_id, client_ts
+        ),
+        locked AS (
+            SELECT up.id, up.topic_id, up.last_client_ts
+            FROM user_progress up
+            WHERE up.user_id = %s AND up.topic_id IN (SELECT topic_id FROM applied)
+            ORDER BY up.id
+            FOR UPDATE OF up
+        ),
+        fresh AS (
+            SELECT locked.id, locked.last_client_ts,
+                   SUM(v.time_spent) AS time_spent,
+                   MAX(v.client_ts) AS client_ts,
+                   (ARRAY_AGG(v.progress ORDER BY v.client_ts DESC))[1] AS progress
+            FROM locked
+            JOIN applied a ON a.topic_id = locked.topic_id
+            JOIN v ON v.topic_id = a.topic_id AND v.client_ts = a.client_ts
+            GROUP BY locked.id, locked.last_client_ts
+        )
+        UPDATE user_progress up
+        SET progress_percentage = CASE
+                WHEN fresh.last_client_ts IS NULL OR fresh.client_ts > fresh.last_client_ts
+                THEN fresh.progress ELSE up.progress_percentage END,
+            time_spent_minutes = COALESCE(up.time_spent_minutes, 0) + fresh.time_spent,
+            last_client_ts = GREATEST(fresh.last_client_ts, fresh.client_ts),
+            last_accessed = CURRENT_TIMESTAMP
+        FROM fresh
+        WHERE up.id = fresh.id
+        RETURNING up.topic_id
+    """, (topic_ids, progress, time_spent, client_ts, user_id, user_id))
+    return [row['topic_id'] for row in await cur.fetchall()]
+
+async def add_time_spent_batch(cur, rows: List[Tuple[int, int, int]]):
+    """Add minutes to many (user_id, topic_id) progress rows in one statement.
+    Rows are locked in primary-key order so concurrent flushes cannot deadlock.
+    """
+    if not rows:
+        return
+    user_ids, topic_ids, minutes = (list(column) for column in zip(*rows))
+    await cur.execute("""
+        WITH v AS (
+            SELECT *
+            FROM unnest(%s::integer[], %s::integer[], %s::integer[]) AS v(user_id, topic_id, minutes)
+        ),
+        locked AS (
+            SELECT up.id, v.minutes
+            FROM user_progress up
+            JOIN v ON up.user_id = v.user_id AND up.topic_id = v.topic_id
+            ORDER BY up.id
+            FOR UPDATE OF up
+        )
+        UPDATE user_progress up
+        SET time_spent_minutes = COALESCE(up.time_spent_minutes, 0) + locked.minutes,
+            last_accessed = CURRENT_TIMESTAMP
+        FROM locked
+        WHERE up.id = locked.id
+    """, (user_ids, topic_ids, minutes))
+
+async def get_topic_detail(cur, topic_id: int) -> Optional[Dict]:
     """Get detailed information about a topic"""
-    cur.execute("""
+    await cur.execute("""
         SELECT id, title, description, content, difficulty_level,
                estimated_hours, level, order_index
         FROM topics
         WHERE id = %s
     """, (topic_id,))
-    return cur.fetchone()
+    return await cur.fetchone()
 
-def get_prerequisite_details(cur, topic_id: int) -> List[Dict]:
+async def get_prerequisite_details(cur, topic_id: int) -> List[Dict]:
     """Get detailed information about prerequisites"""
-    cur.execute("""
+    await cur.execute("""
         SELECT t.id, t.title, t.level
         FROM topics t
         INNER JOIN topic_prerequisites tp ON t.id = tp.prerequisite_topic_id
         WHERE tp.topic_id = %s
     """, (topic_id,))
-    return cur.fetchall()
+    return await cur.fetchall()
 
-def get_topic_resources(cur, topic_id: int) -> List[Dict]:
+async def get_topic_resources(cur, topic_id: int) -> List[Dict]:
     """Get learning resources for a topic"""
-    cur.execute("""
+    await cur.execute("""
         SELECT id, title, resource_url, resource_type, platform, duration_minutes
         FROM learning_resources
         WHERE topic_id = %s
         ORDER BY order_index NULLS LAST, id
     """, (topic_id,))
-    return cur.fetchall()
+    return await cur.fetchall()
+
+async def get_content_version(cur) -> int:
+    """Get the current curriculum content version"""
+    await cur.execute("SELECT version FROM content_version")
+    result = await cur.fetchone()
+    return result['version'] if result else 0
+
+async def get_all_topics(cur) -> List[Dict]:
+    """Get every topic, ordered for display within each level"""
+    await cur.execute("""
+        SELECT id, title, description, content, difficulty_level,
+               estimated_hours, order_index, level
+        FROM topics
+        ORDER BY level, order_index, id
+    """)
+    return await cur.fetchall()
+
+async def get_all_prerequisite_edges(cur) -> List[Dict]:
+    """Get every (topic_id, prerequisite_topic_id) edge"""
+    await cur.execute("""
+        SELECT topic_id, prerequisite_topic_id
+        FROM topic_prerequisites
+        ORDER BY topic_id, prerequisite_topic_id
+    """)
+    return await cur.fetchall()
+
+async def get_all_topic_resources(cur) -> List[Dict]:
+    """Get learning resources for every topic"""
+    await cur.execute("""
+        SELECT id, topic_id, title, resource_url, resource_type, platform, duration_minutes
+        FROM learning_resources
+        ORDER BY topic_id, order_index NULLS LAST, id
+    """)
+    return await cur.fetchall()
@@ -0,0 +1,51 @@
+from typing import List, Dict, Optional
+
+# Summary counts recomputed from user_progress, optionally for one user
+_ACTUAL_COUNTS = """
+    SELECT up.user_id, t.level,
+           COUNT(*) FILTER (WHERE up.status = 'completed') AS completed_count,
+           COUNT(*) FILTER (WHERE up.status = 'in_progress') AS in_progress_count
+    FROM user_progress up
+    JOIN topics t ON t.id = up.topic_id
+    WHERE t.level IS NOT NULL AND (%(user_id)s::integer IS NULL OR up.user_id = %(user_id)s)
+    GROUP BY up.user_id, t.level
+"""
+
+async def rebuild_user_level_progress(cur, user_id: Optional[int] = None) -> int:
+    """Recompute user_level_progress from user_progress (all users or one user).
+    Blocks progress writes for the rest of the transaction so no trigger update is lost.
+    Returns the number of summary rows written.
+    """
+    await cur.execute("LOCK TABLE user_progress IN SHARE MODE")
+    await cur.execute("""
+        DELETE FROM user_level_progress
+        WHERE %(user_id)s::integer IS NULL OR user_id = %(user_id)s
+    """, {"user_id": user_id})
+    await cur.execute(f"""
+        INSERT INTO user_level_progress (user_id, level, completed_count, in_progress_count)
+        {_ACTUAL_COUNTS}
+    """, {"user_id": user_id})
+    return cur.rowcount
+
+async def find_user_level_progress_drift(cur, user_id: Optional[int] = None) -> List[Dict]:
+    """Get summary rows whose counts differ from what user_progress implies"""
+    await cur.execute(f"""
+        WITH actual AS ({_ACTUAL_COUNTS}),
+        stored AS (
+            SELECT user_id, level, completed_count, in_progress_count
+            FROM user_level_progress
+            WHERE %(user_id)s::integer IS NULL OR user_id = %(user_id)s
+        )
+        SELECT COALESCE(a.user_id, s.user_id) AS user_id,
+               COALESCE(a.level, s.level) AS level,
+               COALESCE(a.completed_count, 0) AS expected_completed,
+               COALESCE(s.completed_count, 0) AS stored_completed,
+               COALESCE(a.in_progress_count, 0) AS expected_in_progress,
+               COALESCE(s.in_progress_count, 0) AS stored_in_progress
+        FROM actual a
+        FULL OUTER JOIN stored s ON s.user_id = a.user_id AND s.level = a.level
+        WHERE COALESCE(a.completed_count, 0) <> COALESCE(s.completed_count, 0)
+           OR COALESCE(a.in_progress_count, 0) <> COALESCE(s.in_progress_count, 0)
+        ORDER BY 1, 2
+    """, {"user_id": user_id})
+    return await cur.fetchall()
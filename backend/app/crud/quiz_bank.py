@@ -0,0 +1,34 @@
+from typing import List, Dict
+import json
+
+async def get_quiz_bank_counts(cur) -> Dict[int, int]:
+    """Get the number of banked questions per topic"""
+    await cur.execute("""
+        SELECT topic_id, COUNT(*) AS total
+        FROM quiz_bank
+        GROUP BY topic_id
+    """)
+    return {row['topic_id']: row['total'] for row in await cur.fetchall()}
+
+async def sample_quiz_questions(cur, topic_id: int, limit: int) -> List[Dict]:
+    """Get a random sample of banked questions for a topic"""
+    await cur.execute("""
+        SELECT question, options, correct_answer, explanation
+        FROM quiz_bank
+        WHERE topic_id = %s
+        ORDER BY random()
+        LIMIT %s
+    """, (topic_id, limit))
+    return await cur.fetchall()
+
+async def add_quiz_questions(cur, topic_id: int, questions: List[Dict]) -> int:
+    """Add questions to a topic's bank, skipping ones already banked. Returns rows inserted"""
+    await cur.executemany("""
+        INSERT INTO quiz_bank (topic_id, question, options, correct_answer, explanation)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (topic_id, question) DO NOTHING
+    """, [
+        (topic_id, q['question'], json.dumps(q['options']), q['correct_answer'], q.get('explanation', ''))
+        for q in questions
+    ])
+    return max(cur.rowcount, 0)
@@ -1,29 +1,28 @@
 from app.schemas.user import UserRegister
-from app.core.security import hash_password
 from typing import Optional, Dict
 
-def check_username_exists(cur, username: str) -> bool:
+async def check_username_exists(cur, username: str) -> bool:
     """Check if username already exists"""
-    cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-    return cur.fetchone() is not None
+    await cur.execute("SELECT id FROM users WHERE username = %s", (username,))
+    return await cur.fetchone() is not None
 
-def check_email_exists(cur, email: str) -> bool:
+async def check_email_exists(cur, email: str) -> bool:
     """Check if email already exists"""
     # Case-insensitive email check to avoid duplicates with different casing
-    cur.execute("SELECT id FROM users WHERE LOWER(email) = LOWER(%s)", (email,))
-    return cur.fetchone() is not None
+    await cur.execute("SELECT id FROM users WHERE LOWER(email) = LOWER(%s)", (email,))
+    return await cur.fetchone() is not None
 
-def create_user(cur, user: UserRegister) -> Optional[Dict]:
-    """Create a new user in the database"""
-    hashed_password = hash_password(user.password)
-    
-    cur.execute(
+async def create_user(cur, user: UserRegister, password_hash: str) -> Optional[Dict]:
+    """Create a new user in the database
+    password_hash: hash of user.password (see hash_password_async)
+    """
+    await cur.execute(
         """
         INSERT INTO users (username, email, password_hash)
         VALUES (%s, %s, %s)
         RETURNING id, username, email
         """,
-        (user.username, user.email, hashed_password)
+        (user.username, user.email, password_hash)
     )
     
-    return cur.fetchone()
\ No newline at end of file
+    return await cur.fetchone()
\ No newline at end of file
@@ -1,10 +1,19 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.auth import router as auth_router
 from app.api.assessment import router as assessment_router
 from app.api.learning_path import router as learning_path_router
 from app.api.chatbot import router as chatbot_router
-from app.core.database import get_db_connection
+from app.core.database import open_pool, close_pool, get_pool_stats
+from app.core.metrics import RequestMetricsMiddleware, register_gauges, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.services.curriculum import start_curriculum_refresh, stop_curriculum_refresh
+from app.services.response_cache import get_response_cache_stats
+from app.services.quiz_bank import start_quiz_bank_worker, stop_quiz_bank_worker
+from app.services.llm_gateway import get_llm_stats
+from app.services.heartbeat import heartbeat_buffer
+from app.services.assessment_key import start_answer_key_refresh, stop_answer_key_refresh
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,6 +44,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement count and timings (Server-Timing header, /metrics)
+app.add_middleware(RequestMetricsMiddleware)
+# Opt-in pyinstrument profiles of sampled or admin-flagged requests
+app.add_middleware(ProfilingMiddleware)
+
+register_gauges("db_pool", "Connection pool statistic (see /health/db).", get_pool_stats)
+register_gauges("llm", "LLM gateway state (see /health/llm).", get_llm_stats)
+register_gauges(
+    "llm_response_cache", "LLM response cache statistic (see /health/cache).", get_response_cache_stats
+)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(assessment_router)
@@ -52,13 +72,50 @@ async def root():
     }
 
 
+@app.get("/health/db", tags=["health"])
+async def database_health():
+    """Connection pool statistics (pool size, wait time, connection hold time)."""
+    return get_pool_stats()
+
+
+@app.get("/health/cache", tags=["health"])
+async def cache_health():
+    """Hit/miss counters for the LLM response cache."""
+    return {"llm_responses": get_response_cache_stats()}
+
+
+@app.get("/health/llm", tags=["health"])
+async def llm_health():
+    """LLM concurrency and circuit breaker state."""
+    return get_llm_stats()
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Request, SQL and pool metrics in Prometheus text format (this worker only)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.on_event("startup")
 async def on_startup():
-    """Optional startup check to log DB connectivity without failing app startup."""
+    """Open the database pool without failing app startup if the database is unreachable."""
     try:
-        conn = get_db_connection()
-        conn.close()
-        logger.info("Database connectivity check: OK")
+        await open_pool()
     except Exception as e:
-        # Log warning but do not crash the app; runtime routes will still attempt connections
-        logger.warning(f"Database connectivity check failed: {e}")
\ No newline at end of file
+        # Log warning but do not crash the app; get_db() falls back to direct connections
+        logger.warning(f"Database pool initialisation failed: {e}")
+    await start_curriculum_refresh()
+    await start_answer_key_refresh()
+    start_quiz_bank_worker()
+    heartbeat_buffer.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop background tasks and close pooled connections."""
+    await stop_quiz_bank_worker()
+    # Flush buffered heartbeats while the pool is still open
+    await heartbeat_buffer.stop()
+    await stop_answer_key_refresh()
+    await stop_curriculum_refresh()
+    await close_pool()
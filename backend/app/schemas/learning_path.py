@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 class TopicResponse(BaseModel):
     id: int
@@ -37,7 +37,57 @@ class TopicDetailResponse(BaseModel):
     prerequisites: List[dict]  # List of prerequisite topics with details
     resources: List[dict]  # Learning resources
 
+class TopicContentResponse(BaseModel):
+    id: int
+    title: str
+    description: str
+    content: str
+    difficulty_level: str
+    estimated_hours: float
+    level: str
+    prerequisites: List[dict]
+    resources: List[dict]
+
 class StartTopicResponse(BaseModel):
     message: str
     topic_id: int
-    status: str
\ No newline at end of file
+    status: str
+
+class UnlockedTopic(BaseModel):
+    id: int
+    title: str
+
+class CompleteTopicResponse(BaseModel):
+    message: str
+    topic_id: int
+    unlocked_topics: List[UnlockedTopic]  # topics whose prerequisites this completion satisfied
+
+class LearningPathSummaryResponse(BaseModel):
+    user_level: str
+    total_topics: int
+    completed_topics: int
+    in_progress_topics: int
+    progress_percentage: float
+    current_topic: Optional[str]
+
+class ProgressEvent(BaseModel):
+    topic_id: int
+    progress: int = Field(..., ge=0, le=100)
+    time_spent: int = Field(0, ge=0)  # minutes spent since the previous event
+    client_ts: datetime  # when the event happened on the client
+    
+    @field_validator('client_ts')
+    def assume_utc(cls, v):
+        # Naive timestamps are taken as UTC so events can be ordered together
+        return v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+
+class ProgressBatchRequest(BaseModel):
+    events: List[ProgressEvent] = Field(..., min_length=1, max_length=1000)
+
+class ProgressBatchResponse(BaseModel):
+    events_received: int
+    updated_topics: List[int]
+    skipped_topics: List[int]  # topics the user has not started, or whose events were all applied before
+
+class HeartbeatRequest(BaseModel):
+    seconds: int = Field(..., ge=1, le=3600)  # time spent since the previous heartbeat
\ No newline at end of file
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from itertools import compress
+from operator import eq
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.assessment import get_assessment_version, get_answer_key_rows, calculate_user_level
+
+logger = logging.getLogger(__name__)
+
+# Stands in for a missing correct answer so it never equals a submitted one
+_NO_ANSWER = object()
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Immutable, per-process assessment answer key.
+
+    Correct answers and points are stored as parallel tuples indexed by question
+    position, so a submission is scored in one pass with no database access.
+    """
+    version: int
+    positions: Mapping[int, int]
+    correct: Tuple[Any, ...]
+    points: Tuple[int, ...]
+    max_points: int
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.correct)
+
+    def score(self, answers: Iterable[Tuple[int, str]]) -> int:
+        """Score (question_id, answer) pairs; later answers to a question win, unknown IDs are ignored."""
+        submitted: List[Any] = [None] * len(self.correct)
+        positions = self.positions
+        for question_id, answer in answers:
+            position = positions.get(question_id)
+            if position is not None:
+                submitted[position] = answer
+        return sum(compress(self.points, map(eq, submitted, self.correct)))
+
+    def grade(self, answers: Iterable[Tuple[int, str]]) -> Tuple[int, str]:
+        """Return (score, assigned_level) for a submission."""
+        score = self.score(answers)
+        return score, calculate_user_level(score, self.max_points)
+
+
+def build_answer_key(version: int, rows: List[Dict]) -> AnswerKey:
+    """Build an answer key from (id, correct_answer, points) rows."""
+    points = tuple(row['points'] or 0 for row in rows)
+    return AnswerKey(
+        version=version,
+        positions=MappingProxyType({row['id']: position for position, row in enumerate(rows)}),
+        correct=tuple(_NO_ANSWER if row['correct_answer'] is None else row['correct_answer'] for row in rows),
+        points=points,
+        max_points=sum(points),
+    )
+
+
+async def load_answer_key(cur) -> AnswerKey:
+    """Read the assessment questions and build an answer key from them."""
+    version = await get_assessment_version(cur)
+    rows = await get_answer_key_rows(cur)
+    return build_answer_key(version, rows)
+
+
+_answer_key: Optional[AnswerKey] = None
+_load_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _load() -> AnswerKey:
+    global _answer_key
+    async with get_db() as conn:
+        answer_key = await load_answer_key(conn.cursor())
+    _answer_key = answer_key
+    logger.info(
+        f"Assessment answer key loaded: version={answer_key.version}, questions={answer_key.total_questions}"
+    )
+    return answer_key
+
+
+async def reload_answer_key() -> AnswerKey:
+    """Load a fresh answer key from the database and make it current."""
+    async with _load_lock:
+        return await _load()
+
+
+async def get_answer_key() -> AnswerKey:
+    """Return the current answer key, loading it on first use if startup could not."""
+    if _answer_key is None:
+        async with _load_lock:
+            if _answer_key is None:
+                await _load()
+    return _answer_key
+
+
+async def refresh_if_changed() -> bool:
+    """Reload the answer key if assessment_version has moved. Returns True on reload."""
+    async with get_db() as conn:
+        version = await get_assessment_version(conn.cursor())
+    if _answer_key is not None and _answer_key.version == version:
+        return False
+    await reload_answer_key()
+    return True
+
+
+async def _refresh_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_if_changed()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep scoring with the previous key; try again on the next tick
+            logger.warning(f"Answer key refresh failed: {e}")
+
+
+async def start_answer_key_refresh() -> None:
+    """Load the initial answer key and start polling for changes."""
+    global _refresh_task
+    try:
+        await reload_answer_key()
+    except Exception as e:
+        logger.warning(f"Initial answer key load failed, will retry on first submission: {e}")
+    if _refresh_task is None and settings.ASSESSMENT_KEY_REFRESH_SECONDS > 0:
+        _refresh_task = asyncio.create_task(_refresh_loop(settings.ASSESSMENT_KEY_REFRESH_SECONDS))
+
+
+async def stop_answer_key_refresh() -> None:
+    """Stop the background refresh task."""
+    global _refresh_task
+    if _refresh_task is None:
+        return
+    _refresh_task.cancel()
+    try:
+        await _refresh_task
+    except asyncio.CancelledError:
+        pass
+    _refresh_task = None
@@ -1,9 +1,11 @@
-from typing import Dict
+from typing import AsyncIterator, Dict, Optional
 import json
 import asyncio
 import logging
 import google.generativeai as genai
 from app.core.config import settings
+from app.services.response_cache import response_cache, make_cache_key
+from app.services.llm_gateway import run_llm, llm_stream_slot, LLMRateLimited, LLMUnavailable
 
 
 _gemini_configured = False
@@ -31,18 +33,12 @@ def _ensure_gemini_initialized():
 
 
 def _call_generate(prompt: str):
-    # Helper to call blocking SDK in a thread
+    # Helper to call blocking SDK on the LLM executor (see llm_gateway.run_llm)
     return _model.generate_content(prompt)
 
 
-async def get_chatbot_response(message: str, user_context: Dict) -> str:
-    """Get response from Gemini with user context."""
-    _ensure_gemini_initialized()
-    if not _model:
-        return "Chatbot is not configured. Please add GEMINI_API_KEY to your environment."
-
-    try:
-        system_prompt = f"""You are a friendly and helpful programming mentor for a learning platform focused on Full-Stack JavaScript Development.
+def _build_chat_prompt(message: str, user_context: Dict) -> str:
+    system_prompt = f"""You are a friendly and helpful programming mentor for a learning platform focused on Full-Stack JavaScript Development.
 
 Student Context:
 - Level: {user_context.get('level', 'beginner')}
@@ -60,23 +56,113 @@ Your role:
 
 Keep responses concise (2-3 paragraphs max) unless asked for detailed explanations."""
 
-        # Combine system prompt and user message into a single content
-        full_prompt = f"{system_prompt}\n\nUser: {message}"
-        # Run blocking call in a thread to avoid blocking the event loop
-        loop = asyncio.get_running_loop()
-        resp = await loop.run_in_executor(None, _call_generate, full_prompt)
-        return (resp.text or "") if resp else ""
+    # Combine system prompt and user message into a single content
+    return f"{system_prompt}\n\nUser: {message}"
+
+
+def _chat_cache_key(message: str, user_context: Dict) -> str:
+    # FAQ-style questions at the same level get the same answer
+    return make_cache_key("chat", level=user_context.get('level', 'beginner'), message=message)
+
+
+async def get_cached_chatbot_response(message: str, user_context: Dict) -> Optional[str]:
+    """Cached answer for this message and learner level, if any (no LLM allowance is used)."""
+    if response_cache is None:
+        return None
+    return await response_cache.get(_chat_cache_key(message, user_context))
+
+
+async def get_chatbot_response(message: str, user_context: Dict, user_id: Optional[int] = None) -> str:
+    """Get response from Gemini with user context.
+
+    Raises LLMRateLimited / LLMUnavailable when the user is over their allowance
+    or the model is overloaded; other failures return an apology message.
+    """
+    _ensure_gemini_initialized()
+    if not _model:
+        return "Chatbot is not configured. Please add GEMINI_API_KEY to your environment."
+
+    cached = await get_cached_chatbot_response(message, user_context)
+    if cached is not None:
+        return cached
+
+    try:
+        full_prompt = _build_chat_prompt(message, user_context)
+        # Run blocking call on the dedicated LLM executor to avoid blocking the event loop
+        resp = await run_llm(_call_generate, full_prompt, user_id=user_id)
+        text = (resp.text or "") if resp else ""
+        if text and response_cache is not None:
+            await response_cache.set(_chat_cache_key(message, user_context), text)
+        return text
+    except (LLMRateLimited, LLMUnavailable):
+        raise
     except Exception as e:
         logger.error(f"[CHATBOT ERROR] {str(e)}", exc_info=True)
         return "Sorry, I'm having trouble responding right now."
 
 
-async def generate_quiz(topic_title: str, topic_content: str, num_questions: int = 5) -> list:
-    """Generate quiz questions for a topic using Gemini."""
+async def stream_chatbot_response(message: str, user_context: Dict,
+                                  user_id: Optional[int] = None) -> AsyncIterator[str]:
+    """Stream the Gemini response as text chunks.
+
+    Uses the SDK's native async streaming, so no executor thread is held while
+    tokens arrive. Callers check get_cached_chatbot_response first; the streamed
+    answer is cached here. The LLM limits apply as for get_chatbot_response, with
+    LLM_TIMEOUT_SECONDS as the deadline for the first response and for each
+    following chunk.
+    """
+    _ensure_gemini_initialized()
+    if not _model:
+        yield "Chatbot is not configured. Please add GEMINI_API_KEY to your environment."
+        return
+
+    parts = []
+    timeout = settings.LLM_TIMEOUT_SECONDS
+    async with llm_stream_slot(user_id):
+        try:
+            response = await asyncio.wait_for(
+                _model.generate_content_async(_build_chat_prompt(message, user_context), stream=True),
+                timeout,
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunk without text parts (e.g. safety metadata only)
+                    continue
+                if text:
+                    parts.append(text)
+                    yield text
+        except asyncio.TimeoutError:
+            raise LLMUnavailable(f"LLM stream exceeded {timeout}s deadline")
+
+    full_text = "".join(parts)
+    if full_text and response_cache is not None:
+        await response_cache.set(_chat_cache_key(message, user_context), full_text)
+
+
+async def generate_quiz(topic_title: str, topic_content: str, num_questions: int = 5,
+                        use_cache: bool = True, user_id: Optional[int] = None) -> list:
+    """Generate quiz questions for a topic using Gemini.
+
+    Pass use_cache=False to always ask the model for fresh questions, and the
+    requesting user's ID to apply their LLM rate limit.
+    """
     _ensure_gemini_initialized()
     if not _model:
         return []
 
+    cache_key = make_cache_key("quiz", topic_title=topic_title, num_questions=num_questions)
+    if use_cache and response_cache is not None:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         prompt = f"""Generate {num_questions} multiple-choice quiz questions for the topic: "{topic_title}"
 
@@ -95,8 +181,7 @@ Return ONLY valid JSON (no markdown) as an array with this exact structure:
 Ensure each question has exactly 4 options and one correct_answer matching one of the options.
 """
 
-        loop = asyncio.get_running_loop()
-        resp = await loop.run_in_executor(None, _call_generate, prompt)
+        resp = await run_llm(_call_generate, prompt, user_id=user_id)
         questions_json = resp.text if resp else "[]"
         # Remove markdown fences if any
         if "```json" in questions_json:
@@ -128,7 +213,11 @@ Ensure each question has exactly 4 options and one correct_answer matching one o
                 "explanation": q.get("explanation", "")
             })
 
+        if normalized and use_cache and response_cache is not None:
+            await response_cache.set(cache_key, normalized)
         return normalized
+    except (LLMRateLimited, LLMUnavailable):
+        raise
     except Exception as e:
         logger.error(f"[QUIZ GENERATION ERROR] {str(e)}", exc_info=True)
         return []
\ No newline at end of file
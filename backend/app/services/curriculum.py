@@ -0,0 +1,322 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.learning_path import (
+    get_content_version, get_all_topics, get_all_prerequisite_edges, get_all_topic_resources
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CurriculumCycleError(ValueError):
+    """The prerequisite graph contains a cycle, so some topics could never be unlocked."""
+
+    def __init__(self, cycle: List[int]):
+        super().__init__(f"Prerequisite cycle (each topic requires the next): {' -> '.join(str(topic_id) for topic_id in cycle)}")
+        self.cycle = cycle
+
+
+@dataclass(frozen=True)
+class CompletionSet:
+    """A user's completed topics as a bitset over the snapshot's topic ordinals.
+
+    Bit ``ordinals[topic_id]`` is set when the topic is completed, so checking a
+    whole prerequisite list is a single ``mask & ~completed`` operation.
+    """
+    mask: int
+    ordinals: Mapping[int, int]
+
+    def __contains__(self, topic_id: int) -> bool:
+        ordinal = self.ordinals.get(topic_id)
+        return ordinal is not None and bool(self.mask >> ordinal & 1)
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def satisfies(self, prerequisite_mask: int) -> bool:
+        """True if every topic in prerequisite_mask is completed."""
+        return prerequisite_mask & ~self.mask == 0
+
+
+@dataclass(frozen=True)
+class CurriculumSnapshot:
+    """Immutable, per-process view of the curriculum content.
+
+    Topics, prerequisite edges and learning resources change only when content is
+    edited, so they are loaded once and shared by every request. A new snapshot is
+    built whenever the content_version row changes; readers never see a partial update.
+    """
+    version: int
+    topics_by_id: Mapping[int, Mapping]
+    topic_ids_by_level: Mapping[str, Tuple[int, ...]]
+    # Same-level prerequisite IDs, as used for unlocking topics on the roadmap
+    prerequisites: Mapping[int, Tuple[int, ...]]
+    # All prerequisites (any level) with id/title/level, as shown on topic detail
+    prerequisite_details: Mapping[int, Tuple[Mapping, ...]]
+    resources: Mapping[int, Tuple[Mapping, ...]]
+    # Dense topic ordinals (bit positions) and prerequisite bitmasks over them
+    ordinals: Mapping[int, int]
+    prerequisite_masks: Mapping[int, int]
+    all_prerequisite_masks: Mapping[int, int]
+    # Per level: (topic bit, same-level prerequisite mask) in display order
+    level_masks: Mapping[str, Tuple[Tuple[int, int], ...]]
+    # Every topic, prerequisites before dependents (all levels)
+    topological_order: Tuple[int, ...]
+    # Reverse same-level edges: topics that list the key as a prerequisite, in topological order
+    dependents: Mapping[int, Tuple[int, ...]]
+
+    def get_topic(self, topic_id: int) -> Optional[Mapping]:
+        return self.topics_by_id.get(topic_id)
+
+    def topics_for_level(self, level: str) -> List[Mapping]:
+        return [self.topics_by_id[topic_id] for topic_id in self.topic_ids_by_level.get(level, ())]
+
+    def prerequisites_for(self, topic_id: int) -> Tuple[int, ...]:
+        return self.prerequisites.get(topic_id, ())
+
+    def prerequisite_details_for(self, topic_id: int) -> Tuple[Mapping, ...]:
+        return self.prerequisite_details.get(topic_id, ())
+
+    def resources_for(self, topic_id: int) -> Tuple[Mapping, ...]:
+        return self.resources.get(topic_id, ())
+
+    def topic_bit(self, topic_id: int) -> int:
+        ordinal = self.ordinals.get(topic_id)
+        return 0 if ordinal is None else 1 << ordinal
+
+    def completion_set(self, completed_topic_ids: Iterable[int]) -> CompletionSet:
+        """Build a CompletionSet from completed topic IDs (unknown IDs are ignored)."""
+        mask = 0
+        for topic_id in completed_topic_ids:
+            ordinal = self.ordinals.get(topic_id)
+            if ordinal is not None:
+                mask |= 1 << ordinal
+        return CompletionSet(mask=mask, ordinals=self.ordinals)
+
+    def dependents_of(self, topic_id: int) -> Tuple[int, ...]:
+        return self.dependents.get(topic_id, ())
+
+    def newly_unlocked(self, topic_id: int, completed_before: CompletionSet) -> List[int]:
+        """Topics unlocked by completing topic_id, given the completions before it.
+
+        Only the topic's dependents are checked, so this is O(out-degree).
+        Returns nothing if the topic was already completed, and never lists
+        dependents that are completed themselves.
+        """
+        bit = self.topic_bit(topic_id)
+        if not bit or completed_before.mask & bit:
+            return []
+        remaining = ~(completed_before.mask | bit)
+        return [
+            dependent for dependent in self.dependents_of(topic_id)
+            if dependent not in completed_before
+            and not self.prerequisite_masks.get(dependent, 0) & remaining
+        ]
+
+    def unlocked_mask(self, level: str, completed: CompletionSet) -> int:
+        """Bitmask of topics at a level whose same-level prerequisites are all completed."""
+        remaining = ~completed.mask
+        unlocked = 0
+        for bit, prerequisite_mask in self.level_masks.get(level, ()):
+            if not prerequisite_mask & remaining:
+                unlocked |= bit
+        return unlocked
+
+
+def _mask(ordinals: Mapping[int, int], topic_ids: Iterable[int]) -> int:
+    mask = 0
+    for topic_id in topic_ids:
+        mask |= 1 << ordinals[topic_id]
+    return mask
+
+
+def _topological_order(topic_ids: Iterable[int], prerequisite_ids: Mapping[int, List[int]]) -> List[int]:
+    """Kahn's algorithm over prerequisite edges; raises CurriculumCycleError on a cycle."""
+    topic_ids = list(topic_ids)
+    waiting = {topic_id: len(prerequisite_ids.get(topic_id, ())) for topic_id in topic_ids}
+    unlocks: Dict[int, List[int]] = {}
+    for topic_id, prereqs in prerequisite_ids.items():
+        for prereq_id in prereqs:
+            unlocks.setdefault(prereq_id, []).append(topic_id)
+
+    order = [topic_id for topic_id in topic_ids if waiting[topic_id] == 0]
+    for topic_id in order:  # order grows while we iterate
+        for dependent in unlocks.get(topic_id, ()):
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                order.append(dependent)
+    if len(order) == len(topic_ids):
+        return order
+
+    # Every topic left waits on another one left, so following prerequisites must revisit a topic
+    stuck = {topic_id for topic_id, count in waiting.items() if count > 0}
+    path: List[int] = []
+    seen: Dict[int, int] = {}
+    topic_id = next(iter(stuck))
+    while topic_id not in seen:
+        seen[topic_id] = len(path)
+        path.append(topic_id)
+        topic_id = next(p for p in prerequisite_ids[topic_id] if p in stuck)
+    raise CurriculumCycleError(path[seen[topic_id]:] + [topic_id])
+
+
+def build_snapshot(version: int, topics: List[Dict], edges: List[Dict],
+                   resources: List[Dict]) -> CurriculumSnapshot:
+    """Build a snapshot from raw topic, prerequisite edge and resource rows.
+
+    Raises CurriculumCycleError if the prerequisite edges contain a cycle.
+    """
+    topics_by_id = {row['id']: MappingProxyType(dict(row)) for row in topics}
+
+    ids_by_level: Dict[str, List[int]] = {}
+    for row in topics:
+        ids_by_level.setdefault(row['level'], []).append(row['id'])
+
+    prerequisites: Dict[int, List[int]] = {}
+    prerequisite_details: Dict[int, List[Mapping]] = {}
+    for edge in edges:
+        topic = topics_by_id.get(edge['topic_id'])
+        prereq = topics_by_id.get(edge['prerequisite_topic_id'])
+        if topic is None or prereq is None:
+            continue
+        prerequisite_details.setdefault(topic['id'], []).append(MappingProxyType({
+            'id': prereq['id'], 'title': prereq['title'], 'level': prereq['level'],
+        }))
+        if topic['level'] == prereq['level']:
+            prerequisites.setdefault(topic['id'], []).append(prereq['id'])
+
+    all_prerequisite_ids = {topic_id: [p['id'] for p in details] for topic_id, details in prerequisite_details.items()}
+    topological_order = _topological_order(topics_by_id, all_prerequisite_ids)
+    position = {topic_id: index for index, topic_id in enumerate(topological_order)}
+    dependents: Dict[int, List[int]] = {}
+    for topic_id, prereq_ids in prerequisites.items():
+        for prereq_id in prereq_ids:
+            dependents.setdefault(prereq_id, []).append(topic_id)
+
+    ordinals = {topic_id: ordinal for ordinal, topic_id in enumerate(topics_by_id)}
+    prerequisite_masks = {
+        topic_id: _mask(ordinals, prereq_ids) for topic_id, prereq_ids in prerequisites.items()
+    }
+    all_prerequisite_masks = {
+        topic_id: _mask(ordinals, (p['id'] for p in details))
+        for topic_id, details in prerequisite_details.items()
+    }
+    level_masks = {
+        level: tuple((1 << ordinals[topic_id], prerequisite_masks.get(topic_id, 0)) for topic_id in topic_ids)
+        for level, topic_ids in ids_by_level.items()
+    }
+
+    resources_by_topic: Dict[int, List[Mapping]] = {}
+    for row in resources:
+        resources_by_topic.setdefault(row['topic_id'], []).append(MappingProxyType(dict(row)))
+
+    return CurriculumSnapshot(
+        version=version,
+        topics_by_id=MappingProxyType(topics_by_id),
+        topic_ids_by_level=MappingProxyType({k: tuple(v) for k, v in ids_by_level.items()}),
+        prerequisites=MappingProxyType({k: tuple(v) for k, v in prerequisites.items()}),
+        prerequisite_details=MappingProxyType({k: tuple(v) for k, v in prerequisite_details.items()}),
+        resources=MappingProxyType({k: tuple(v) for k, v in resources_by_topic.items()}),
+        ordinals=MappingProxyType(ordinals),
+        prerequisite_masks=MappingProxyType(prerequisite_masks),
+        all_prerequisite_masks=MappingProxyType(all_prerequisite_masks),
+        level_masks=MappingProxyType(level_masks),
+        topological_order=tuple(topological_order),
+        dependents=MappingProxyType({
+            k: tuple(sorted(v, key=position.__getitem__)) for k, v in dependents.items()
+        }),
+    )
+
+
+
+async def load_snapshot(cur) -> CurriculumSnapshot:
+    """Read the full curriculum and build a snapshot from it."""
+    version = await get_content_version(cur)
+    topics = await get_all_topics(cur)
+    edges = await get_all_prerequisite_edges(cur)
+    resources = await get_all_topic_resources(cur)
+    return build_snapshot(version, topics, edges, resources)
+
+
+_snapshot: Optional[CurriculumSnapshot] = None
+_load_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _load() -> CurriculumSnapshot:
+    global _snapshot
+    async with get_db() as conn:
+        snapshot = await load_snapshot(conn.cursor())
+    _snapshot = snapshot
+    logger.info(
+        f"Curriculum snapshot loaded: version={snapshot.version}, topics={len(snapshot.topics_by_id)}"
+    )
+    return snapshot
+
+
+async def reload_curriculum() -> CurriculumSnapshot:
+    """Load a fresh snapshot from the database and make it current."""
+    async with _load_lock:
+        return await _load()
+
+
+async def get_curriculum() -> CurriculumSnapshot:
+    """Return the current snapshot, loading it on first use if startup could not."""
+    if _snapshot is None:
+        async with _load_lock:
+            if _snapshot is None:
+                await _load()
+    return _snapshot
+
+
+async def refresh_if_changed() -> bool:
+    """Reload the snapshot if the content_version row has moved. Returns True on reload."""
+    async with get_db() as conn:
+        version = await get_content_version(conn.cursor())
+    if _snapshot is not None and _snapshot.version == version:
+        return False
+    await reload_curriculum()
+    return True
+
+
+async def _refresh_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_if_changed()
+        except asyncio.CancelledError:
+            raise
+        except CurriculumCycleError as e:
+            # Keep serving the previous snapshot until the content is fixed
+            logger.error(f"Curriculum refresh rejected: {e}")
+        except Exception as e:
+            # Keep serving the previous snapshot; try again on the next tick
+            logger.warning(f"Curriculum refresh failed: {e}")
+
+
+async def start_curriculum_refresh() -> None:
+    """Load the initial snapshot and start polling for content changes."""
+    global _refresh_task
+    try:
+        await reload_curriculum()
+    except Exception as e:
+        logger.warning(f"Initial curriculum load failed, will retry on first request: {e}")
+    if _refresh_task is None and settings.CURRICULUM_REFRESH_SECONDS > 0:
+        _refresh_task = asyncio.create_task(_refresh_loop(settings.CURRICULUM_REFRESH_SECONDS))
+
+
+async def stop_curriculum_refresh() -> None:
+    """Stop the background refresh task."""
+    global _refresh_task
+    if _refresh_task is None:
+        return
+    _refresh_task.cancel()
+    try:
+        await _refresh_task
+    except asyncio.CancelledError:
+        pass
+    _refresh_task = None
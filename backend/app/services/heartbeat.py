@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.learning_path import add_time_spent_batch
+
+logger = logging.getLogger(__name__)
+
+
+class HeartbeatBuffer:
+    """Per-worker write-behind buffer for time-spent heartbeats.
+
+    Heartbeats are coalesced per (user_id, topic_id) in memory and written in one
+    batched UPDATE every `flush_interval` seconds, or sooner once `max_pending`
+    pairs are waiting. Time is buffered in seconds; only whole minutes are
+    written and the remainder carries over to the next flush. Rows from a failed
+    flush are retried while fewer than `max_requeue` pairs are buffered, so an
+    outage cannot grow the buffer without bound.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int, max_requeue: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_requeue = max_requeue
+        self._pending: Dict[Tuple[int, int], int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._early_flush: Optional[asyncio.Task] = None
+
+    def add(self, user_id: int, topic_id: int, seconds: int) -> None:
+        key = (user_id, topic_id)
+        self._pending[key] = self._pending.get(key, 0) + seconds
+        if len(self._pending) >= self.max_pending and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+
+    async def flush(self, final: bool = False) -> int:
+        """Write buffered time. Returns the number of rows written.
+
+        On the final flush, leftover seconds are rounded to the nearest minute.
+        """
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            rows = []
+            carry = {}
+            for (user_id, topic_id), seconds in pending.items():
+                minutes, remainder = divmod(seconds, 60)
+                if final and remainder >= 30:
+                    minutes += 1
+                elif not final and remainder:
+                    carry[(user_id, topic_id)] = remainder
+                if minutes:
+                    rows.append((user_id, topic_id, minutes))
+            self._merge(carry)
+            if not rows:
+                return 0
+            try:
+                async with get_db() as conn:
+                    await add_time_spent_batch(conn.cursor(), rows)
+            except Exception as e:
+                # Keep the time for the next attempt, up to max_requeue buffered pairs
+                dropped = self._requeue(rows)
+                logger.warning(f"Heartbeat flush failed, {len(rows) - len(dropped)} rows re-queued: {e}")
+                if dropped:
+                    logger.warning(
+                        f"Heartbeat buffer full, dropped {len(dropped)} rows "
+                        f"({sum(minutes for _, _, minutes in dropped)} minutes)"
+                    )
+                return 0
+            return len(rows)
+
+    def _requeue(self, rows: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+        """Put failed rows back in the buffer; returns the rows that did not fit."""
+        dropped = []
+        for user_id, topic_id, minutes in rows:
+            key = (user_id, topic_id)
+            if key in self._pending or len(self._pending) < self.max_requeue:
+                self._pending[key] = self._pending.get(key, 0) + minutes * 60
+            else:
+                dropped.append((user_id, topic_id, minutes))
+        return dropped
+
+    def _merge(self, seconds_by_key: Dict[Tuple[int, int], int]) -> None:
+        for key, seconds in seconds_by_key.items():
+            self._pending[key] = self._pending.get(key, 0) + seconds
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Heartbeat flush failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(final=True)
+
+
+heartbeat_buffer = HeartbeatBuffer(
+    settings.HEARTBEAT_FLUSH_SECONDS, settings.HEARTBEAT_MAX_PENDING, settings.HEARTBEAT_MAX_REQUEUE
+)
@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, TypeVar
+import asyncio
+import logging
+import time
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMRateLimited(Exception):
+    """The user has used up their LLM request allowance for now."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class LLMUnavailable(Exception):
+    """The LLM is overloaded, timing out, or the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` burst, refilled at `rate` tokens per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class CircuitBreaker:
+    """Stops calling the LLM after repeated failures or timeouts.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls fail
+    fast for `reset_timeout` seconds; then one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise LLMUnavailable if the circuit is open; True if this call is the half-open trial."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise LLMUnavailable("LLM circuit breaker is open")
+        if state == "half_open":
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def end_trial(self) -> None:
+        """Let another trial through if this one ended without an outcome (queue timeout, cancellation)."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"LLM circuit breaker opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+_executor = ThreadPoolExecutor(max_workers=settings.LLM_EXECUTOR_WORKERS, thread_name_prefix="llm")
+_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+_buckets = TTLCache(maxsize=100000, ttl=3600)
+_breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS)
+_in_flight = 0
+
+
+def check_rate_limit(user_id: Optional[int]) -> None:
+    """Consume one request from the user's token bucket, or raise LLMRateLimited.
+
+    Background work (user_id None) is not rate limited.
+    """
+    if user_id is None or settings.LLM_USER_RATE_PER_MINUTE <= 0:
+        return
+    bucket = _buckets.get(user_id)
+    if bucket is None:
+        bucket = TokenBucket(settings.LLM_USER_BURST, settings.LLM_USER_RATE_PER_MINUTE / 60)
+        _buckets.set(user_id, bucket)
+    retry_after = bucket.try_acquire()
+    if retry_after > 0:
+        raise LLMRateLimited(retry_after)
+
+
+async def _acquire_slot() -> None:
+    try:
+        await asyncio.wait_for(_slots.acquire(), settings.LLM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise LLMUnavailable("Too many concurrent LLM requests")
+
+
+async def run_llm(func: Callable[..., T], *args, user_id: Optional[int] = None) -> T:
+    """Run a blocking LLM SDK call on the dedicated executor.
+
+    Applies the per-user rate limit, the circuit breaker, the global concurrency
+    limit and a per-call deadline (LLM_TIMEOUT_SECONDS). The concurrency slot is
+    held until the worker thread actually finishes, so timed-out calls cannot pile
+    up behind new ones.
+    """
+    global _in_flight
+    check_rate_limit(user_id)
+    trial = _breaker.before_call()
+    try:
+        await _acquire_slot()
+
+        _in_flight += 1
+
+        def _release(_future) -> None:
+            global _in_flight
+            _in_flight -= 1
+            _slots.release()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_executor, func, *args)
+        future.add_done_callback(_release)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), settings.LLM_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            _breaker.record_failure()
+            raise LLMUnavailable(f"LLM call exceeded {settings.LLM_TIMEOUT_SECONDS}s deadline")
+        except Exception:
+            _breaker.record_failure()
+            raise
+        _breaker.record_success()
+        return result
+    finally:
+        # CancelledError and slot-queue timeouts record no outcome; never leave the trial marked
+        if trial:
+            _breaker.end_trial()
+
+
+@asynccontextmanager
+async def llm_stream_slot(user_id: Optional[int] = None) -> AsyncIterator[None]:
+    """Apply the same limits as run_llm around a natively async (streaming) call.
+
+    The caller is responsible for its own per-chunk deadlines.
+    """
+    global _in_flight
+    check_rate_limit(user_id)
+    trial = _breaker.before_call()
+    try:
+        await _acquire_slot()
+        _in_flight += 1
+        try:
+            yield
+        except Exception:
+            _breaker.record_failure()
+            raise
+        else:
+            _breaker.record_success()
+        finally:
+            _in_flight -= 1
+            _slots.release()
+    finally:
+        if trial:
+            _breaker.end_trial()
+
+
+def get_llm_stats() -> Dict[str, Any]:
+    return {
+        "in_flight": _in_flight,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+        "circuit_state": _breaker.state,
+        "consecutive_failures": _breaker.failures,
+    }
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional
+import asyncio
+import logging
+from app.core.config import settings
+from app.core.database import get_db
+from app.crud.quiz_bank import get_quiz_bank_counts, add_quiz_questions
+from app.services.chatbot import generate_quiz
+from app.services.curriculum import get_curriculum
+
+logger = logging.getLogger(__name__)
+
+_worker_task: Optional[asyncio.Task] = None
+
+
+def validate_quiz_question(question: Dict) -> bool:
+    """Only bank questions that need no padding or guessing to be usable.
+
+    generate_quiz pads missing options and defaults the answer to the first
+    option; such questions are fine for a one-off live quiz but not worth keeping.
+    """
+    text = (question.get("question") or "").strip()
+    options = question.get("options") or []
+    if not text or len(options) != 4:
+        return False
+    if any(not isinstance(o, str) or not o.strip() or o == f"Option {chr(65 + i)}"
+           for i, o in enumerate(options)):
+        return False
+    if len(set(options)) != 4:
+        return False
+    return question.get("correct_answer") in options
+
+
+async def bank_questions(topic_id: int, questions: List[Dict]) -> int:
+    """Store the valid questions for a topic. Returns how many were new to the bank."""
+    valid = [q for q in questions if validate_quiz_question(q)]
+    if not valid:
+        return 0
+    async with get_db() as conn:
+        return await add_quiz_questions(conn.cursor(), topic_id, valid)
+
+
+async def fill_quiz_bank(target_size: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+    """Top up every topic's bank to target_size questions.
+
+    Topics are filled one LLM call at a time so a refill never competes with
+    user traffic for model capacity. A topic is skipped until the next run once
+    a batch adds nothing new. Returns the number of questions banked.
+    """
+    target_size = target_size or settings.QUIZ_BANK_TARGET_SIZE
+    batch_size = batch_size or settings.QUIZ_BANK_BATCH_SIZE
+    curriculum = await get_curriculum()
+
+    async with get_db() as conn:
+        counts = await get_quiz_bank_counts(conn.cursor())
+
+    generated = 0
+    for topic_id, topic in curriculum.topics_by_id.items():
+        missing = target_size - counts.get(topic_id, 0)
+        while missing > 0:
+            questions = await generate_quiz(
+                topic['title'],
+                topic['content'] or "",
+                min(batch_size, missing),
+                use_cache=False,
+            )
+            if not questions:
+                logger.warning(f"Quiz bank: no questions generated for topic {topic_id}")
+                break
+            banked = await bank_questions(topic_id, questions)
+            if not banked:
+                logger.warning(f"Quiz bank: no new valid questions for topic {topic_id}")
+                break
+            generated += banked
+            missing -= banked
+            logger.info(f"Quiz bank: topic {topic_id} +{banked} questions")
+    return generated
+
+
+async def _worker_loop(interval: float) -> None:
+    while True:
+        try:
+            await fill_quiz_bank()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Quiz bank refill failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_quiz_bank_worker() -> None:
+    """Start the background refill task if enabled and Gemini is configured.
+
+    Enable it on one instance only (or run `python -m app.commands.fill_quiz_bank`
+    from a scheduler); duplicates are ignored but LLM calls would be repeated.
+    """
+    global _worker_task
+    if _worker_task is not None or not settings.QUIZ_BANK_WORKER_ENABLED:
+        return
+    if not settings.GEMINI_API_KEY:
+        logger.info("Quiz bank worker not started: GEMINI_API_KEY is not set")
+        return
+    _worker_task = asyncio.create_task(_worker_loop(settings.QUIZ_BANK_REFILL_SECONDS))
+
+
+async def stop_quiz_bank_worker() -> None:
+    """Stop the background refill task."""
+    global _worker_task
+    if _worker_task is None:
+        return
+    _worker_task.cancel()
+    try:
+        await _worker_task
+    except asyncio.CancelledError:
+        pass
+    _worker_task = None
@@ -0,0 +1,120 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import re
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+def _normalise(value: Any) -> Any:
+    """Case- and whitespace-insensitive form of a prompt input."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    return value
+
+
+def make_cache_key(kind: str, **inputs: Any) -> str:
+    """Build a stable cache key from normalised prompt inputs."""
+    normalised = {name: _normalise(value) for name, value in inputs.items()}
+    raw = json.dumps([kind, settings.GEMINI_MODEL, normalised], sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+class MemoryResponseCache:
+    """Per-process LRU cache of LLM responses."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._cache.set(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+class PostgresResponseCache:
+    """LLM responses shared between workers via the llm_response_cache table.
+
+    Backed by a small in-process LRU so repeated hits on one worker skip the
+    database. Database errors are logged and treated as misses.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        try:
+            async with get_db() as conn:
+                cur = conn.cursor()
+                await cur.execute("""
+                    SELECT value
+                    FROM llm_response_cache
+                    WHERE cache_key = %s AND expires_at > CURRENT_TIMESTAMP
+                """, (key,))
+                row = await cur.fetchone()
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._local.set(key, row['value'])
+        return row['value']
+
+    async def set(self, key: str, value: Any) -> None:
+        self._local.set(key, value)
+        try:
+            async with get_db() as conn:
+                cur = conn.cursor()
+                await cur.execute("""
+                    INSERT INTO llm_response_cache (cache_key, value, expires_at)
+                    VALUES (%s, %s, CURRENT_TIMESTAMP + make_interval(secs => %s))
+                    ON CONFLICT (cache_key)
+                    DO UPDATE SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at
+                """, (key, json.dumps(value), self.ttl))
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._local),
+            "maxsize": self._local.maxsize,
+        }
+
+
+def _create_cache():
+    backend = (settings.LLM_CACHE_BACKEND or "none").lower()
+    if backend == "memory":
+        return MemoryResponseCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+    if backend == "postgres":
+        return PostgresResponseCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+    if backend != "none":
+        logger.warning(f"Unknown LLM_CACHE_BACKEND '{backend}', response caching disabled")
+    return None
+
+
+response_cache = _create_cache()
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    if response_cache is None:
+        return {"backend": "none"}
+    return {"backend": settings.LLM_CACHE_BACKEND.lower(), **response_cache.stats()}
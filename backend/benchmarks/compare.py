@@ -0,0 +1,53 @@
+"""Compare two benchmark result files.
+
+Usage (from backend/):
+    python -m benchmarks.compare OLD.json NEW.json
+"""
+from typing import Optional
+import argparse
+import json
+
+METRICS = (
+    ("rps", lambda r: r["throughput_rps"], True),
+    ("p50", lambda r: r["latency_ms"]["p50"], False),
+    ("p95", lambda r: r["latency_ms"]["p95"], False),
+    ("p99", lambda r: r["latency_ms"]["p99"], False),
+    ("q/req", lambda r: r["queries_per_request"], False),
+)
+
+
+def _change(old: Optional[float], new: Optional[float], higher_is_better: bool) -> str:
+    if old is None or new is None:
+        return f"{'-':>8} -> {'-':>8}"
+    if not old:
+        return f"{old:>8.1f} -> {new:>8.1f}"
+    pct = (new - old) / old * 100
+    better = pct > 0 if higher_is_better else pct < 0
+    mark = "" if abs(pct) < 5 else (" +" if better else " !")
+    return f"{old:>8.1f} -> {new:>8.1f} ({pct:+.0f}%){mark}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args()
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"{args.old} ({old.get('git_commit')}) -> {args.new} ({new.get('git_commit')})")
+    print("'+' marks an improvement and '!' a regression of 5% or more")
+    for name, new_result in new["scenarios"].items():
+        old_result = old["scenarios"].get(name)
+        if old_result is None:
+            print(f"\n{name}: not in {args.old}")
+            continue
+        print(f"\n{name}")
+        for label, metric, higher_is_better in METRICS:
+            print(f"  {label:6} {_change(metric(old_result), metric(new_result), higher_is_better)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Local stand-in for the Gemini model with configurable latency.
+
+install() swaps it in for the real model in app.services.chatbot, so chatbot
+routes run through the real gateway, cache and prompt code without network calls.
+"""
+from typing import AsyncIterator
+import asyncio
+import random
+import time
+
+ANSWER = (
+    "Closures let a function remember the variables from the scope it was created in. "
+    "Try writing a counter factory that returns an increment function, then call it a few times. "
+) * 4
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Mimics GenerativeModel.generate_content / generate_content_async(stream=True)."""
+
+    def __init__(self, latency: float, jitter: float = 0.0, chunks: int = 8, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunks = max(1, chunks)
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        # Called on the LLM executor thread, like the blocking SDK call
+        self.calls += 1
+        time.sleep(self._delay())
+        return FakeResponse(ANSWER)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        self.calls += 1
+        delay = self._delay()
+        if not stream:
+            await asyncio.sleep(delay)
+            return FakeResponse(ANSWER)
+        return self._stream(delay)
+
+    async def _stream(self, delay: float) -> AsyncIterator[FakeResponse]:
+        size = -(-len(ANSWER) // self.chunks)
+        for start in range(0, len(ANSWER), size):
+            await asyncio.sleep(delay / self.chunks)
+            yield FakeResponse(ANSWER[start:start + size])
+
+
+def install(latency: float, jitter: float = 0.0) -> FakeGenerativeModel:
+    """Use a fake model for every chatbot and quiz call in this process."""
+    from app.services import chatbot
+
+    model = FakeGenerativeModel(latency, jitter)
+    chatbot._model = model
+    chatbot._gemini_configured = True
+    return model
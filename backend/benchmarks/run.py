@@ -0,0 +1,290 @@
+"""Drive the main API endpoints at fixed concurrency and record latency.
+
+Usage (from backend/, with `python -m benchmarks.server` running):
+    python -m benchmarks.run [--base-url http://127.0.0.1:8001] [--concurrency 20] [--requests 500]
+                             [--users 200] [--scenarios login,learning_path,...] [--label NAME]
+
+Each scenario runs in turn and reports throughput, p50/p95/p99 latency and SQL
+statements per request (from the Server-Timing header, or from pg_stat_statements
+when the header is disabled).
+Results are saved to benchmarks/results/ as JSON; compare two runs with
+`python -m benchmarks.compare OLD.json NEW.json`.
+
+start/complete and assessment submissions change the seeded data, so re-run
+`python -m benchmarks.seed --reset` between runs you want to compare.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import subprocess
+import time
+import httpx
+from app.core.database import get_db
+from benchmarks.seed import TOPIC_PREFIX, USER_PREFIX
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+_STATEMENTS = re.compile(r'db;desc="(\d+) statements"')
+
+
+@dataclass
+class BenchUser:
+    id: int
+    username: str
+    level: str
+    # First topic at the user's level that is not completed yet (None if all done)
+    next_topic_id: Optional[int]
+    token: Optional[str] = None
+
+
+@dataclass
+class Context:
+    users: List[BenchUser]
+    topic_ids_by_level: Dict[str, List[int]]
+    question_ids: List[int] = field(default_factory=list)
+    password: str = ""
+
+
+# name -> (method, build(ctx, user, n) -> (path, json body or None))
+Request = Tuple[str, Optional[Dict[str, Any]]]
+SCENARIOS: Dict[str, Tuple[str, Callable[[Context, BenchUser, int], Request]]] = {
+    "login": ("POST", lambda ctx, u, n: (
+        "/api/login", {"username": u.username, "password": ctx.password})),
+    "learning_path": ("GET", lambda ctx, u, n: ("/api/learning-path/", None)),
+    "topic_detail": ("GET", lambda ctx, u, n: (
+        f"/api/learning-path/topics/{random.choice(ctx.topic_ids_by_level[u.level])}", None)),
+    "start": ("POST", lambda ctx, u, n: (f"/api/learning-path/topics/{u.next_topic_id}/start", None)),
+    "complete": ("POST", lambda ctx, u, n: (f"/api/learning-path/topics/{u.next_topic_id}/complete", None)),
+    "assessment_submit": ("POST", lambda ctx, u, n: ("/api/assessment/submit", {
+        "answers": [{"question_id": q, "answer": random.choice(("Yes", "No"))} for q in ctx.question_ids]})),
+    "chatbot_ask": ("POST", lambda ctx, u, n: (
+        "/api/chatbot/ask", {"message": f"How do closures work in JavaScript? (request {n})"})),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarise(latencies: List[float], statuses: List[int], elapsed: float,
+              statements: Optional[int]) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    codes: Dict[str, int] = {}
+    for code in statuses:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+    return {
+        "requests": count,
+        "errors": sum(1 for code in statuses if code >= 400),
+        "status_codes": codes,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / count * 1000, 2) if count else 0.0,
+            "p50": round(percentile(ordered, 50) * 1000, 2),
+            "p95": round(percentile(ordered, 95) * 1000, 2),
+            "p99": round(percentile(ordered, 99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2) if count else 0.0,
+        },
+        "queries_per_request": round(statements / count, 2) if statements is not None and count else None,
+    }
+
+
+async def load_context(user_count: int, password: str) -> Context:
+    async with get_db() as conn:
+        cur = conn.cursor()
+        await cur.execute("""
+            SELECT id, level
+            FROM topics
+            WHERE title LIKE %s
+            ORDER BY level, order_index
+        """, (TOPIC_PREFIX + "%",))
+        topic_ids_by_level: Dict[str, List[int]] = {}
+        for row in await cur.fetchall():
+            topic_ids_by_level.setdefault(row['level'], []).append(row['id'])
+
+        await cur.execute("""
+            SELECT u.id, u.username, u.current_level,
+                   (SELECT t.id
+                    FROM topics t
+                    LEFT JOIN user_progress up ON up.topic_id = t.id AND up.user_id = u.id
+                    WHERE t.level = u.current_level AND t.title LIKE %s
+                      AND up.status IS DISTINCT FROM 'completed'
+                    ORDER BY t.order_index
+                    LIMIT 1) AS next_topic_id
+            FROM users u
+            WHERE u.username LIKE %s
+            ORDER BY u.id
+            LIMIT %s
+        """, (TOPIC_PREFIX + "%", USER_PREFIX + "%", user_count))
+        users = [
+            BenchUser(row['id'], row['username'], row['current_level'], row['next_topic_id'])
+            for row in await cur.fetchall()
+        ]
+        await cur.execute("SELECT id FROM assessment_questions ORDER BY order_index")
+        question_ids = [row['id'] for row in await cur.fetchall()]
+
+    if not users or not topic_ids_by_level:
+        raise SystemExit("No benchmark data found; run `python -m benchmarks.seed` first")
+    return Context(users=users, topic_ids_by_level=topic_ids_by_level,
+                   question_ids=question_ids, password=password)
+
+
+async def statement_count() -> Optional[int]:
+    """Total statements recorded by pg_stat_statements for this database, or None if unavailable."""
+    try:
+        async with get_db() as conn:
+            cur = conn.cursor()
+            await cur.execute("""
+                SELECT COALESCE(SUM(calls), 0) AS calls
+                FROM pg_stat_statements
+                WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+                  AND query NOT ILIKE '%%pg_stat_statements%%'
+            """)
+            return int((await cur.fetchone())['calls'])
+    except Exception:
+        return None
+
+
+async def login_all(client: httpx.AsyncClient, ctx: Context, concurrency: int) -> None:
+    """Get a token for every benchmark user that does not have one yet."""
+    pending = [u for u in ctx.users if u.token is None]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(u: BenchUser) -> None:
+        async with semaphore:
+            response = await client.post("/api/login", json={"username": u.username, "password": ctx.password})
+            if response.status_code == 200:
+                u.token = response.json()["access_token"]
+
+    await asyncio.gather(*(login(u) for u in pending))
+    ctx.users = [u for u in ctx.users if u.token is not None]
+    if not ctx.users:
+        raise SystemExit("Could not log in any benchmark user; check --password and the server")
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Context, name: str, concurrency: int,
+                       requests: int, warmup: int) -> Dict[str, Any]:
+    method, build = SCENARIOS[name]
+    users = ctx.users
+    if name in ("start", "complete"):
+        users = [u for u in users if u.next_topic_id is not None]
+    counter = itertools.count()
+    latencies: List[float] = []
+    statuses: List[int] = []
+    header_statements: List[int] = []
+
+    async def worker(total: int, record: bool) -> None:
+        while True:
+            n = next(counter)
+            if n >= total:
+                return
+            u = users[n % len(users)]
+            path, body = build(ctx, u, n)
+            headers = {"Authorization": f"Bearer {u.token}"} if name != "login" else {}
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                status = response.status_code
+                timing = _STATEMENTS.search(response.headers.get("server-timing", ""))
+            except httpx.HTTPError:
+                status, timing = 599, None
+            if record:
+                latencies.append(time.perf_counter() - started)
+                statuses.append(status)
+                if timing:
+                    header_statements.append(int(timing.group(1)))
+
+    if warmup:
+        await asyncio.gather(*(worker(warmup, False) for _ in range(concurrency)))
+        counter = itertools.count()
+
+    before = await statement_count()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(requests, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await statement_count()
+    if len(header_statements) == len(latencies):
+        statements = sum(header_statements)
+    else:
+        statements = after - before if before is not None and after is not None else None
+    return summarise(latencies, statuses, elapsed, statements)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'scenario':20} {'reqs':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/req':>7}")
+    for name, r in results.items():
+        qpr = "-" if r["queries_per_request"] is None else f"{r['queries_per_request']:.1f}"
+        print(f"{name:20} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>9.1f} "
+              f"{r['latency_ms']['p50']:>9.1f} {r['latency_ms']['p95']:>9.1f} {r['latency_ms']['p99']:>9.1f} {qpr:>7}")
+
+
+async def run(args) -> Path:
+    random.seed(args.seed)
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    ctx = await load_context(args.users, args.password)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    started_at = datetime.now(timezone.utc)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        for name in names:
+            if name != "login":
+                await login_all(client, ctx, args.concurrency)
+            results[name] = await run_scenario(client, ctx, name, args.concurrency, args.requests, args.warmup)
+            print(f"{name}: done")
+
+    print_report(results)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    suffix = f"-{args.label}" if args.label else ""
+    path = RESULTS_DIR / f"{started_at.strftime('%Y%m%dT%H%M%SZ')}{suffix}.json"
+    path.write_text(json.dumps({
+        "label": args.label,
+        "started_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "password"},
+        "users": len(ctx.users),
+        "scenarios": results,
+    }, indent=2))
+    print(f"Results saved to {path}")
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight at once")
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests before each scenario")
+    parser.add_argument("--users", type=int, default=200, help="benchmark users to spread requests over")
+    parser.add_argument("--password", default="benchpass123", help="password given to benchmarks.seed")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated, run in this order")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for request parameters")
+    parser.add_argument("--label", default="", help="added to the results file name")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
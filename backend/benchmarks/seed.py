@@ -0,0 +1,138 @@
+"""Seed a local database with a synthetic curriculum and users for benchmarking.
+
+Usage (from backend/):
+    python -m benchmarks.seed [--topics-per-level 30] [--fan-in 2] [--resources-per-topic 1]
+                              [--users 500] [--password benchpass123] [--seed 42] [--reset]
+
+Benchmark rows are tagged (topic titles start with "[bench]", usernames with
+"bench_user_") so --reset can remove them without touching real data. Run the
+SQL files and migrations first. Never point this at a production database.
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import random
+from app.core.database import get_db
+from app.core.security import pwd_context
+
+LEVELS = ("beginner", "intermediate", "advanced")
+LEVEL_WEIGHTS = (0.5, 0.35, 0.15)
+RESOURCE_TYPES = ("video", "article", "interactive", "documentation", "course")
+TOPIC_PREFIX = "[bench]"
+USER_PREFIX = "bench_user_"
+
+
+async def reset(cur) -> None:
+    # Progress, prerequisites, resources and assessments cascade from these
+    await cur.execute("DELETE FROM users WHERE username LIKE %s", (USER_PREFIX + "%",))
+    await cur.execute("DELETE FROM topics WHERE title LIKE %s", (TOPIC_PREFIX + "%",))
+
+
+async def seed_curriculum(cur, rng: random.Random, topics_per_level: int, fan_in: int,
+                          resources_per_topic: int) -> Dict[str, List[int]]:
+    """Insert topics, same-level prerequisite edges and resources. Returns topic IDs per level in order."""
+    topic_ids: Dict[str, List[int]] = {}
+    for level in LEVELS:
+        ids = []
+        for index in range(topics_per_level):
+            await cur.execute("""
+                INSERT INTO topics (title, description, content, difficulty_level, estimated_hours, order_index, level)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+            """, (
+                f"{TOPIC_PREFIX} {level} topic {index + 1}",
+                f"Synthetic {level} topic {index + 1}",
+                "Lorem ipsum dolor sit amet. " * rng.randint(20, 200),
+                level,
+                round(rng.uniform(0.5, 8), 2),
+                index + 1,
+                level,
+            ))
+            ids.append((await cur.fetchone())['id'])
+        topic_ids[level] = ids
+
+        # Prerequisites point only at earlier topics, so the graph stays acyclic
+        edges = []
+        for index, topic_id in enumerate(ids):
+            for prereq_id in rng.sample(ids[:index], min(fan_in, index)):
+                edges.append((topic_id, prereq_id))
+        if edges:
+            await cur.executemany(
+                "INSERT INTO topic_prerequisites (topic_id, prerequisite_topic_id) VALUES (%s, %s)", edges
+            )
+
+        resources = [
+            (topic_id, f"{TOPIC_PREFIX} resource {n + 1}", f"https://example.com/{topic_id}/{n + 1}",
+             rng.choice(RESOURCE_TYPES), "example", rng.randint(5, 90), n + 1)
+            for topic_id in ids for n in range(resources_per_topic)
+        ]
+        if resources:
+            # learning_resources currently allows one resource per topic; extras are skipped
+            await cur.executemany("""
+                INSERT INTO learning_resources
+                    (topic_id, title, resource_url, resource_type, platform, duration_minutes, order_index)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+            """, resources)
+    return topic_ids
+
+
+async def seed_users(cur, rng: random.Random, topic_ids: Dict[str, List[int]], users: int, password: str) -> None:
+    """Insert users with an assessed level and progress on a prefix of that level's topics."""
+    # One hash shared by every benchmark user; hashing each would take minutes
+    password_hash = pwd_context.hash(password)
+    rows = [
+        (f"{USER_PREFIX}{n}", f"{USER_PREFIX}{n}@example.com", password_hash,
+         rng.choices(LEVELS, LEVEL_WEIGHTS)[0])
+        for n in range(users)
+    ]
+    await cur.executemany("""
+        INSERT INTO users (username, email, password_hash, current_level, has_completed_assessment)
+        VALUES (%s, %s, %s, %s, TRUE)
+    """, rows)
+    await cur.execute(
+        "SELECT id, current_level FROM users WHERE username LIKE %s ORDER BY id", (USER_PREFIX + "%",)
+    )
+    seeded = await cur.fetchall()
+
+    async with cur.copy("""
+        COPY user_progress (user_id, topic_id, status, progress_percentage, time_spent_minutes, last_accessed)
+        FROM STDIN
+    """) as copy:
+        for row in seeded:
+            ids = topic_ids[row['current_level']]
+            # Complete a prefix in display order (prerequisites are always earlier), then work on 0-2 more
+            completed = rng.randint(0, len(ids))
+            in_progress = min(rng.randint(0, 2), len(ids) - completed)
+            for topic_id in ids[:completed]:
+                await copy.write_row((row['id'], topic_id, "completed", 100, rng.randint(10, 300), "now"))
+            for topic_id in ids[completed:completed + in_progress]:
+                await copy.write_row((row['id'], topic_id, "in_progress", rng.randint(5, 95),
+                                      rng.randint(1, 120), "now"))
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    async with get_db() as conn:
+        cur = conn.cursor()
+        if args.reset:
+            await reset(cur)
+        topic_ids = await seed_curriculum(cur, rng, args.topics_per_level, args.fan_in, args.resources_per_topic)
+        await seed_users(cur, rng, topic_ids, args.users, args.password)
+    print(f"Seeded {args.topics_per_level * len(LEVELS)} topics and {args.users} users")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics-per-level", type=int, default=30)
+    parser.add_argument("--fan-in", type=int, default=2, help="prerequisites per topic (same level)")
+    parser.add_argument("--resources-per-topic", type=int, default=1)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--password", default="benchpass123", help="password shared by all benchmark users")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, for reproducible data")
+    parser.add_argument("--reset", action="store_true", help="delete earlier benchmark rows first")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Run the API for benchmarking, with Gemini replaced by a local fake.
+
+Usage (from backend/):
+    python -m benchmarks.server [--port 8001] [--llm-latency 0.8] [--llm-jitter 0.2]
+
+Runs a single uvicorn worker so the fake model is installed in the serving
+process. Per-user LLM rate limits, the LLM response cache and the quiz bank
+worker are off unless set explicitly in the environment, so every chatbot
+request reaches the fake model.
+"""
+import argparse
+import os
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="seconds per fake Gemini call")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="+/- seconds of random latency")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so these must be set before importing the app
+    os.environ.setdefault("LLM_USER_RATE_PER_MINUTE", "0")
+    os.environ.setdefault("LLM_CACHE_BACKEND", "none")
+    os.environ.setdefault("QUIZ_BANK_WORKER_ENABLED", "false")
+
+    import uvicorn
+    from app.main import app
+    from benchmarks.fake_gemini import install
+
+    install(args.llm_latency, args.llm_jitter)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
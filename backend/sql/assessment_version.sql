@@ -0,0 +1,20 @@
+-- Assessment answer key version
+-- The API caches the assessment answer key in memory and reloads it whenever
+-- this version changes. Run after assessment_schema.sql and content_version.sql.
+ALTER TABLE content_version ADD COLUMN IF NOT EXISTS assessment_version BIGINT NOT NULL DEFAULT 1;
+
+-- Bump the version whenever assessment questions, answers or points change
+CREATE OR REPLACE FUNCTION bump_assessment_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE content_version
+    SET assessment_version = assessment_version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS bump_assessment_version_questions ON assessment_questions;
+CREATE TRIGGER bump_assessment_version_questions
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON assessment_questions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_assessment_version();
@@ -0,0 +1,38 @@
+-- Curriculum content version
+-- The API keeps an in-memory snapshot of topics, prerequisites and resources and
+-- reloads it whenever this version changes. Run after learning_tables.sql and
+-- learning_resources.sql.
+CREATE TABLE IF NOT EXISTS content_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO content_version (id, version) VALUES (TRUE, 1)
+ON CONFLICT DO NOTHING;
+
+-- Bump the version whenever curriculum content changes
+CREATE OR REPLACE FUNCTION bump_content_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE content_version
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS bump_content_version_topics ON topics;
+CREATE TRIGGER bump_content_version_topics
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON topics
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
+
+DROP TRIGGER IF EXISTS bump_content_version_topic_prerequisites ON topic_prerequisites;
+CREATE TRIGGER bump_content_version_topic_prerequisites
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON topic_prerequisites
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
+
+DROP TRIGGER IF EXISTS bump_content_version_learning_resources ON learning_resources;
+CREATE TRIGGER bump_content_version_learning_resources
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON learning_resources
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_content_version();
@@ -31,12 +31,21 @@ CREATE TABLE IF NOT EXISTS user_progress (
     progress_percentage INTEGER DEFAULT 0 CHECK (progress_percentage >= 0 AND progress_percentage <= 100),
     time_spent_minutes INTEGER DEFAULT 0,
     last_accessed TIMESTAMP,
+    last_client_ts TIMESTAMPTZ,  -- newest batch-sync event applied, so late batches cannot roll progress back
     completed_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(user_id, topic_id)
 );
 
+-- Batch-sync events already applied, so retried batches do not add time twice
+CREATE TABLE IF NOT EXISTS progress_sync_events (
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    topic_id INTEGER REFERENCES topics(id) ON DELETE CASCADE,
+    client_ts TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, topic_id, client_ts)
+);
+
 -- Topic prerequisites (for roadmap dependencies)
 CREATE TABLE IF NOT EXISTS topic_prerequisites (
     topic_id INTEGER REFERENCES topics(id) ON DELETE CASCADE,
@@ -0,0 +1,13 @@
+-- Shared cache of LLM chatbot answers and generated quizzes
+-- Only needed when LLM_CACHE_BACKEND=postgres
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key VARCHAR(100) PRIMARY KEY,
+    value JSONB NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires ON llm_response_cache(expires_at);
+
+-- Expired rows are ignored on read; purge them periodically with:
+-- DELETE FROM llm_response_cache WHERE expires_at <= CURRENT_TIMESTAMP;
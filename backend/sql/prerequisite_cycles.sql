@@ -0,0 +1,30 @@
+-- Reject prerequisite cycles
+-- A cycle in topic_prerequisites would leave every topic on it locked forever.
+-- The API also refuses to load a curriculum snapshot containing a cycle and keeps
+-- serving the previous one. Run after learning_tables.sql.
+CREATE OR REPLACE FUNCTION reject_prerequisite_cycle()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- The new edge closes a cycle if the topic is already reachable from its prerequisite
+    IF EXISTS (
+        WITH RECURSIVE reachable(topic_id) AS (
+            SELECT prerequisite_topic_id
+            FROM topic_prerequisites
+            WHERE topic_id = NEW.prerequisite_topic_id
+            UNION
+            SELECT tp.prerequisite_topic_id
+            FROM topic_prerequisites tp
+            JOIN reachable r ON tp.topic_id = r.topic_id
+        )
+        SELECT 1 FROM reachable WHERE topic_id = NEW.topic_id
+    ) THEN
+        RAISE EXCEPTION 'Prerequisite % -> % would create a cycle', NEW.topic_id, NEW.prerequisite_topic_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS reject_prerequisite_cycle ON topic_prerequisites;
+CREATE TRIGGER reject_prerequisite_cycle
+    BEFORE INSERT OR UPDATE ON topic_prerequisites
+    FOR EACH ROW EXECUTE FUNCTION reject_prerequisite_cycle();
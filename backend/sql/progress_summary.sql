@@ -0,0 +1,73 @@
+-- Per-user, per-level progress counters
+-- Maintained incrementally by triggers on user_progress so dashboards and the
+-- chatbot read one row instead of scanning progress. Rebuild or verify with
+-- `python -m app.commands.rebuild_progress_summary [--check]`.
+CREATE TABLE IF NOT EXISTS user_level_progress (
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    level VARCHAR(20) CHECK (level IN ('beginner', 'intermediate', 'advanced')),
+    completed_count INTEGER NOT NULL DEFAULT 0,
+    in_progress_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, level)
+);
+
+CREATE OR REPLACE FUNCTION maintain_user_level_progress()
+RETURNS TRIGGER AS $$
+DECLARE
+    topic_level VARCHAR(20);
+BEGIN
+    -- Remove the old row's contribution
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT level INTO topic_level FROM topics WHERE id = OLD.topic_id;
+        IF topic_level IS NOT NULL THEN
+            UPDATE user_level_progress
+            SET completed_count = completed_count - (OLD.status = 'completed')::int,
+                in_progress_count = in_progress_count - (OLD.status = 'in_progress')::int,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = OLD.user_id AND level = topic_level;
+        END IF;
+    END IF;
+
+    -- Add the new row's contribution
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT level INTO topic_level FROM topics WHERE id = NEW.topic_id;
+        IF topic_level IS NOT NULL THEN
+            INSERT INTO user_level_progress (user_id, level, completed_count, in_progress_count)
+            VALUES (NEW.user_id, topic_level,
+                    (NEW.status = 'completed')::int, (NEW.status = 'in_progress')::int)
+            ON CONFLICT (user_id, level) DO UPDATE
+            SET completed_count = user_level_progress.completed_count + EXCLUDED.completed_count,
+                in_progress_count = user_level_progress.in_progress_count + EXCLUDED.in_progress_count,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS maintain_user_level_progress_insert_delete ON user_progress;
+CREATE TRIGGER maintain_user_level_progress_insert_delete
+    AFTER INSERT OR DELETE ON user_progress
+    FOR EACH ROW EXECUTE FUNCTION maintain_user_level_progress();
+
+-- Progress/time updates that keep the status don't touch the summary
+DROP TRIGGER IF EXISTS maintain_user_level_progress_update ON user_progress;
+CREATE TRIGGER maintain_user_level_progress_update
+    AFTER UPDATE ON user_progress
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status
+          OR OLD.topic_id IS DISTINCT FROM NEW.topic_id
+          OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+    EXECUTE FUNCTION maintain_user_level_progress();
+
+-- Backfill from existing progress
+INSERT INTO user_level_progress (user_id, level, completed_count, in_progress_count)
+SELECT up.user_id, t.level,
+       COUNT(*) FILTER (WHERE up.status = 'completed'),
+       COUNT(*) FILTER (WHERE up.status = 'in_progress')
+FROM user_progress up
+JOIN topics t ON t.id = up.topic_id
+WHERE t.level IS NOT NULL
+GROUP BY up.user_id, t.level
+ON CONFLICT (user_id, level) DO NOTHING;
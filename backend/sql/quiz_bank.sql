@@ -0,0 +1,15 @@
+-- Pre-generated quiz questions per topic
+-- Filled by the quiz bank worker (QUIZ_BANK_WORKER_ENABLED) or
+-- `python -m app.commands.fill_quiz_bank`; /api/chatbot/quiz samples from it.
+CREATE TABLE IF NOT EXISTS quiz_bank (
+    id SERIAL PRIMARY KEY,
+    topic_id INTEGER NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+    question TEXT NOT NULL,
+    options JSONB NOT NULL,
+    correct_answer TEXT NOT NULL,
+    explanation TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(topic_id, question)
+);
+
+CREATE INDEX IF NOT EXISTS idx_quiz_bank_topic ON quiz_bank(topic_id);
@@ -0,0 +1,12 @@
+import os
+
+# Settings() requires these; tests never open a database connection
+for key, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_NAME": "test",
+    "DATABASE_USER": "test",
+    "DATABASE_PASSWORD": "test",
+    "SECRET_KEY": "test-secret",
+}.items():
+    os.environ.setdefault(key, value)
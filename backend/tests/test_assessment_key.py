@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+from app.services import assessment_key
+from app.services.assessment_key import build_answer_key
+
+
+def _key(version=1):
+    return build_answer_key(version, [
+        {"id": 10, "correct_answer": "Yes", "points": 1},
+        {"id": 11, "correct_answer": "No", "points": 2},
+        {"id": 12, "correct_answer": None, "points": 3},
+        {"id": 13, "correct_answer": "Yes", "points": None},
+    ])
+
+
+def test_scores_correct_answers_by_points():
+    key = _key()
+    assert key.total_questions == 4
+    assert key.max_points == 6
+    assert key.score([(10, "Yes"), (11, "No")]) == 3
+    assert key.score([(10, "No"), (11, "Yes")]) == 0
+    assert key.score([]) == 0
+
+
+def test_duplicate_question_ids_use_the_last_answer():
+    key = _key()
+    assert key.score([(10, "Yes"), (10, "No")]) == 0
+    assert key.score([(10, "No"), (10, "Yes")]) == 1
+    # Repeating a correct answer does not score it twice
+    assert key.score([(11, "No"), (11, "No"), (11, "No")]) == 2
+
+
+def test_unknown_question_ids_are_ignored():
+    key = _key()
+    assert key.score([(999, "Yes"), (10, "Yes"), (-1, "No")]) == 1
+
+
+def test_question_without_correct_answer_never_scores():
+    key = _key()
+    for answer in ("", "None", "Yes", "No"):
+        assert key.score([(12, answer)]) == 0
+    # Unanswered questions do not match a missing correct answer either
+    assert key.score([(10, "Yes")]) == 1
+
+
+def test_grade_returns_level():
+    key = _key()
+    assert key.grade([]) == (0, "beginner")
+    # 3 of 6 points (question 13 is worth nothing) is 50%
+    assert key.grade([(10, "Yes"), (11, "No"), (13, "Yes")]) == (3, "intermediate")
+
+
+def test_empty_key():
+    key = build_answer_key(1, [])
+    assert key.max_points == 0
+    assert key.grade([(1, "Yes")]) == (0, "beginner")
+
+
+def test_version_change_replaces_cached_key(monkeypatch):
+    state = {"version": 1, "rows": [{"id": 10, "correct_answer": "Yes", "points": 1}]}
+
+    @contextlib.asynccontextmanager
+    async def fake_db():
+        yield type("Conn", (), {"cursor": lambda self: None})()
+
+    async def get_version(cur):
+        return state["version"]
+
+    async def get_rows(cur):
+        return state["rows"]
+
+    monkeypatch.setattr(assessment_key, "get_db", fake_db)
+    monkeypatch.setattr(assessment_key, "get_assessment_version", get_version)
+    monkeypatch.setattr(assessment_key, "get_answer_key_rows", get_rows)
+    monkeypatch.setattr(assessment_key, "_answer_key", None)
+
+    async def scenario():
+        monkeypatch.setattr(assessment_key, "_load_lock", asyncio.Lock())
+        first = await assessment_key.get_answer_key()
+        assert first.score([(10, "Yes")]) == 1
+
+        # Same version: the cached key is kept even if rows changed underneath
+        state["rows"] = [{"id": 10, "correct_answer": "No", "points": 1}]
+        assert await assessment_key.refresh_if_changed() is False
+        assert await assessment_key.get_answer_key() is first
+
+        state["version"] = 2
+        assert await assessment_key.refresh_if_changed() is True
+        second = await assessment_key.get_answer_key()
+        assert second.version == 2
+        assert second.score([(10, "Yes")]) == 0
+        assert second.score([(10, "No")]) == 1
+
+    asyncio.run(scenario())
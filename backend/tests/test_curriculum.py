@@ -0,0 +1,174 @@
+import pytest
+from app.services.curriculum import CurriculumCycleError, build_snapshot
+
+
+def _topic(topic_id, level="beginner"):
+    return {"id": topic_id, "title": f"Topic {topic_id}", "level": level}
+
+
+def _snapshot(topics, edges):
+    """Snapshot from in-memory rows; edges are (topic_id, prerequisite_topic_id) pairs."""
+    return build_snapshot(
+        1,
+        [t if isinstance(t, dict) else _topic(t) for t in topics],
+        [{"topic_id": topic_id, "prerequisite_topic_id": prereq_id} for topic_id, prereq_id in edges],
+        [],
+    )
+
+
+def _before(order, first, second):
+    return order.index(first) < order.index(second)
+
+
+def test_topological_order_puts_prerequisites_first():
+    # 4 requires 2 and 3, which both require 1; listed in reverse
+    snapshot = _snapshot([4, 3, 2, 1], [(4, 2), (4, 3), (2, 1), (3, 1)])
+    order = snapshot.topological_order
+    assert sorted(order) == [1, 2, 3, 4]
+    for topic_id, prereq_id in [(4, 2), (4, 3), (2, 1), (3, 1)]:
+        assert _before(order, prereq_id, topic_id)
+
+
+def test_topological_order_follows_cross_level_edges():
+    topics = [_topic(2, "intermediate"), _topic(1, "beginner")]
+    snapshot = _snapshot(topics, [(2, 1)])
+    assert snapshot.topological_order == (1, 2)
+    # Cross-level edges order topics but do not gate unlocking
+    assert snapshot.prerequisites_for(2) == ()
+    assert snapshot.dependents_of(1) == ()
+
+
+def test_no_prerequisites_keeps_input_order():
+    snapshot = _snapshot([3, 1, 2], [])
+    assert snapshot.topological_order == (3, 1, 2)
+    assert dict(snapshot.dependents) == {}
+
+
+def test_edges_to_unknown_topics_are_ignored():
+    snapshot = _snapshot([1, 2], [(2, 1), (2, 99), (98, 1)])
+    assert snapshot.topological_order == (1, 2)
+    assert snapshot.prerequisites_for(2) == (1,)
+
+
+def test_dependents_are_in_topological_order():
+    snapshot = _snapshot([1, 2, 3, 4], [(4, 1), (2, 1), (3, 1), (4, 3), (3, 2)])
+    assert snapshot.dependents_of(1) == (2, 3, 4)
+
+
+def test_two_topic_cycle_is_reported():
+    with pytest.raises(CurriculumCycleError) as excinfo:
+        _snapshot([1, 2, 3], [(1, 3), (3, 1), (2, 1)])
+    assert excinfo.value.cycle == [1, 3, 1]
+    assert "1 -> 3 -> 1" in str(excinfo.value)
+
+
+def test_cycle_path_excludes_topics_that_only_lead_into_it():
+    # 4 waits on the 1 -> 2 -> 3 -> 1 cycle but is not part of it
+    with pytest.raises(CurriculumCycleError) as excinfo:
+        _snapshot([4, 1, 2, 3], [(4, 1), (1, 2), (2, 3), (3, 1)])
+    cycle = excinfo.value.cycle
+    assert cycle[0] == cycle[-1]
+    assert sorted(cycle[:-1]) == [1, 2, 3]
+    # Each topic in the path requires the next one
+    edges = {(1, 2), (2, 3), (3, 1)}
+    assert all((a, b) in edges for a, b in zip(cycle, cycle[1:]))
+
+
+def test_cycle_across_levels_is_reported():
+    topics = [_topic(1, "beginner"), _topic(2, "intermediate")]
+    with pytest.raises(CurriculumCycleError):
+        _snapshot(topics, [(1, 2), (2, 1)])
+
+
+def _chain():
+    # 1 <- 2 <- 3 at beginner level; intermediate 10 requires beginner 3
+    return _snapshot([1, 2, 3, _topic(10, "intermediate")], [(2, 1), (3, 2), (10, 3)])
+
+
+def test_topic_without_prerequisites_is_always_satisfied():
+    snapshot = _chain()
+    empty = snapshot.completion_set([])
+    assert snapshot.prerequisite_masks.get(1, 0) == 0
+    assert snapshot.all_prerequisite_masks.get(1, 0) == 0
+    assert empty.satisfies(snapshot.prerequisite_masks.get(1, 0))
+    assert snapshot.unlocked_mask("beginner", empty) == snapshot.topic_bit(1)
+
+
+def test_unknown_completed_ids_are_ignored():
+    snapshot = _chain()
+    completed = snapshot.completion_set([999, 1, -5])
+    assert len(completed) == 1
+    assert 1 in completed
+    assert 999 not in completed
+    assert completed.mask == snapshot.topic_bit(1)
+    assert snapshot.topic_bit(999) == 0
+
+
+def test_masks_hold_direct_prerequisites_only():
+    snapshot = _chain()
+    # Completing the direct prerequisite is enough; 1 is not required for 3
+    assert snapshot.completion_set([2]).satisfies(snapshot.prerequisite_masks[3])
+    # Completing only a prerequisite's prerequisite is not
+    assert not snapshot.completion_set([1]).satisfies(snapshot.prerequisite_masks[3])
+    assert snapshot.prerequisite_masks[3] == snapshot.topic_bit(2)
+
+
+def test_same_level_versus_all_prerequisite_masks():
+    snapshot = _chain()
+    # Cross-level prerequisites are shown on topic detail but do not gate starting
+    assert snapshot.prerequisite_masks.get(10, 0) == 0
+    assert snapshot.all_prerequisite_masks[10] == snapshot.topic_bit(3)
+    nothing = snapshot.completion_set([])
+    assert nothing.satisfies(snapshot.prerequisite_masks.get(10, 0))
+    assert not nothing.satisfies(snapshot.all_prerequisite_masks[10])
+    assert snapshot.completion_set([3]).satisfies(snapshot.all_prerequisite_masks[10])
+
+
+def test_satisfies_needs_every_prerequisite():
+    snapshot = _snapshot([1, 2, 3], [(3, 1), (3, 2)])
+    assert not snapshot.completion_set([1]).satisfies(snapshot.prerequisite_masks[3])
+    assert snapshot.completion_set([1, 2]).satisfies(snapshot.prerequisite_masks[3])
+
+
+def test_unlocked_mask_per_level():
+    snapshot = _chain()
+    unlocked = snapshot.unlocked_mask("beginner", snapshot.completion_set([1]))
+    assert unlocked == snapshot.topic_bit(1) | snapshot.topic_bit(2)
+    assert snapshot.unlocked_mask("intermediate", snapshot.completion_set([])) == snapshot.topic_bit(10)
+    assert snapshot.unlocked_mask("advanced", snapshot.completion_set([1, 2, 3])) == 0
+
+
+def test_newly_unlocked_reports_dependents_whose_prerequisites_are_now_met():
+    snapshot = _snapshot([1, 2, 3], [(2, 1), (3, 1)])
+    assert snapshot.newly_unlocked(1, snapshot.completion_set([])) == [2, 3]
+
+
+def test_newly_unlocked_skips_dependents_with_other_unmet_prerequisites():
+    # 3 needs both 1 and 2
+    snapshot = _snapshot([1, 2, 3], [(3, 1), (3, 2)])
+    assert snapshot.newly_unlocked(1, snapshot.completion_set([])) == []
+    assert snapshot.newly_unlocked(2, snapshot.completion_set([1])) == [3]
+
+
+def test_newly_unlocked_skips_dependents_that_were_already_unlocked():
+    # 3 only needs 1, which was completed earlier; completing 2 changes nothing for it
+    snapshot = _snapshot([1, 2, 3, 4], [(3, 1), (4, 2)])
+    assert snapshot.newly_unlocked(2, snapshot.completion_set([1])) == [4]
+
+
+def test_newly_unlocked_skips_dependents_already_completed():
+    snapshot = _snapshot([1, 2, 3], [(2, 1), (3, 1)])
+    assert snapshot.newly_unlocked(1, snapshot.completion_set([2])) == [3]
+
+
+def test_newly_unlocked_when_recompleting_a_completed_topic():
+    # Its dependents were unlocked by the first completion
+    snapshot = _snapshot([1, 2], [(2, 1)])
+    assert snapshot.newly_unlocked(1, snapshot.completion_set([1])) == []
+    assert snapshot.newly_unlocked(1, snapshot.completion_set([1, 2])) == []
+
+
+def test_newly_unlocked_ignores_unknown_topics_and_cross_level_dependents():
+    snapshot = _snapshot([1, _topic(2, "intermediate")], [(2, 1)])
+    assert snapshot.newly_unlocked(1, snapshot.completion_set([])) == []
+    assert snapshot.newly_unlocked(999, snapshot.completion_set([])) == []
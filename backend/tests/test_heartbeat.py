@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import pytest
+from app.services import heartbeat
+from app.services.heartbeat import HeartbeatBuffer
+
+
+class _Calls(list):
+    def __init__(self):
+        super().__init__()
+        self.state = {"fail": False}
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Rows passed to add_time_spent_batch; set state["fail"] to simulate an outage."""
+    calls = _Calls()
+    state = calls.state
+
+    @contextlib.asynccontextmanager
+    async def fake_db():
+        yield type("Conn", (), {"cursor": lambda self: None})()
+
+    async def add_time_spent_batch(cur, rows):
+        if state["fail"]:
+            raise ConnectionError("database unavailable")
+        calls.append(sorted(rows))
+
+    monkeypatch.setattr(heartbeat, "get_db", fake_db)
+    monkeypatch.setattr(heartbeat, "add_time_spent_batch", add_time_spent_batch)
+    return calls
+
+
+def _run(coro_fn):
+    return asyncio.run(coro_fn())
+
+
+def _buffer(max_requeue=100):
+    return HeartbeatBuffer(flush_interval=60, max_pending=1000, max_requeue=max_requeue)
+
+
+def test_whole_minutes_written_and_seconds_carried(written):
+    async def scenario():
+        buffer = _buffer()
+        buffer.add(1, 10, 45)
+        buffer.add(1, 10, 45)  # 90s: 1 minute written, 30s carried
+        buffer.add(2, 20, 50)  # under a minute: nothing written yet
+        assert await buffer.flush() == 1
+        assert written[-1] == [(1, 10, 1)]
+        buffer.add(1, 10, 30)  # 30s carried + 30s
+        buffer.add(2, 20, 10)  # 50s carried + 10s
+        assert await buffer.flush() == 2
+        assert written[-1] == [(1, 10, 1), (2, 20, 1)]
+        assert await buffer.flush() == 0
+
+    _run(scenario)
+
+
+def test_final_flush_rounds_to_nearest_minute(written):
+    async def scenario():
+        buffer = _buffer()
+        buffer.add(1, 10, 89)   # 1m29s -> 1
+        buffer.add(1, 11, 90)   # 1m30s -> 2
+        buffer.add(1, 12, 29)   # rounds down to nothing
+        buffer.add(1, 13, 30)   # rounds up to 1
+        assert await buffer.flush(final=True) == 3
+        assert written[-1] == [(1, 10, 1), (1, 11, 2), (1, 13, 1)]
+        # Nothing carries past the final flush
+        assert await buffer.flush() == 0
+
+    _run(scenario)
+
+
+def test_failed_flush_requeues_time(written):
+    async def scenario():
+        buffer = _buffer()
+        buffer.add(1, 10, 150)  # 2 minutes + 30s carried
+        written.state["fail"] = True
+        assert await buffer.flush() == 0
+        written.state["fail"] = False
+        buffer.add(1, 10, 30)
+        assert await buffer.flush() == 1
+        assert written[-1] == [(1, 10, 3)]
+
+    _run(scenario)
+
+
+def test_failed_flush_drops_rows_beyond_requeue_limit(written, caplog):
+    async def scenario():
+        buffer = _buffer(max_requeue=2)
+        for topic_id in range(5):
+            buffer.add(1, topic_id, 60)
+        written.state["fail"] = True
+        assert await buffer.flush() == 0
+        written.state["fail"] = False
+        assert await buffer.flush() == 2
+        assert len(written[-1]) == 2
+
+    _run(scenario)
+    assert "dropped 3 rows (3 minutes)" in caplog.text
+
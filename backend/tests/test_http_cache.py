@@ -0,0 +1,53 @@
+from app.core.http_cache import build_payload, etag_matches, payload_response
+
+ETAG = '"abc123"'
+
+
+def test_exact_match():
+    assert etag_matches('"abc123"', ETAG)
+
+
+def test_weak_prefix_matches():
+    assert etag_matches('W/"abc123"', ETAG)
+
+
+def test_comma_separated_list():
+    assert etag_matches('"other", W/"abc123" , "third"', ETAG)
+    assert etag_matches('"other","abc123"', ETAG)
+    assert not etag_matches('"other", W/"nope"', ETAG)
+
+
+def test_wildcard_matches_anything():
+    assert etag_matches("*", ETAG)
+    assert etag_matches(" * ", ETAG)
+
+
+def test_mismatch_and_missing_header():
+    assert not etag_matches('"abc124"', ETAG)
+    assert not etag_matches("abc123", ETAG)  # unquoted is not the same tag
+    assert not etag_matches('"abc123-gzip"', ETAG)
+    assert not etag_matches(None, ETAG)
+    assert not etag_matches("", ETAG)
+
+
+def test_payload_response_returns_304_on_match():
+    payload = build_payload({"questions": [1, 2, 3]})
+    response = payload_response(payload, f"W/{payload.etag}")
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == payload.etag
+
+
+def test_payload_response_sends_body_on_mismatch():
+    payload = build_payload({"questions": [1, 2, 3]})
+    for if_none_match in (None, '"stale"'):
+        response = payload_response(payload, if_none_match)
+        assert response.status_code == 200
+        assert response.body == payload.body
+        assert response.headers["etag"] == payload.etag
+        assert "max-age" in response.headers["cache-control"]
+
+
+def test_etag_changes_with_content():
+    assert build_payload({"a": 1}).etag == build_payload({"a": 1}).etag
+    assert build_payload({"a": 1}).etag != build_payload({"a": 2}).etag
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import pytest
+from app.core.config import settings
+from app.services import llm_gateway
+from app.services.llm_gateway import CircuitBreaker, LLMUnavailable
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """A breaker that is already half-open and a single concurrency slot."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    monkeypatch.setattr(llm_gateway, "_breaker", breaker)
+    monkeypatch.setattr(settings, "LLM_USER_RATE_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT_SECONDS", 0.05)
+    return breaker
+
+
+def _use_fresh_slots(monkeypatch, count=1):
+    # asyncio primitives bind to the loop that first waits on them
+    slots = asyncio.Semaphore(count)
+    monkeypatch.setattr(llm_gateway, "_slots", slots)
+    return slots
+
+
+def test_trial_released_when_slot_wait_times_out(gateway, monkeypatch):
+    async def scenario():
+        slots = _use_fresh_slots(monkeypatch)
+        await slots.acquire()  # a slow call from before the circuit opened still holds it
+        with pytest.raises(LLMUnavailable, match="concurrent"):
+            await llm_gateway.run_llm(lambda: "unused")
+        slots.release()
+        return await llm_gateway.run_llm(lambda: "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+    assert gateway.state == "closed"
+
+
+def test_trial_released_when_call_is_cancelled(gateway, monkeypatch):
+    release = threading.Event()
+
+    async def scenario():
+        _use_fresh_slots(monkeypatch, count=2)
+        task = asyncio.create_task(llm_gateway.run_llm(release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+        return await llm_gateway.run_llm(lambda: "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+    assert gateway.state == "closed"
+
+
+def test_trial_released_when_stream_is_cancelled(gateway, monkeypatch):
+    async def stream():
+        async with llm_gateway.llm_stream_slot():
+            await asyncio.sleep(10)
+
+    async def scenario():
+        _use_fresh_slots(monkeypatch)
+        task = asyncio.create_task(stream())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        async with llm_gateway.llm_stream_slot():
+            pass
+
+    asyncio.run(scenario())
+    assert gateway.state == "closed"
+
+
+def test_second_call_rejected_while_trial_in_flight(gateway, monkeypatch):
+    release = threading.Event()
+
+    async def scenario():
+        _use_fresh_slots(monkeypatch, count=2)
+        trial = asyncio.create_task(llm_gateway.run_llm(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(LLMUnavailable, match="circuit breaker"):
+            await llm_gateway.run_llm(lambda: "unused")
+        release.set()
+        await trial
+
+    asyncio.run(scenario())
+    assert gateway.state == "closed"